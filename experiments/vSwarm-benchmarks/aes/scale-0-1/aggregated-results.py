@@ -1,22 +1,39 @@
 import os
 import sys
 import csv
-import matplotlib.pyplot as plt
+import math
 import numpy as np
 from pathlib import Path
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from results import (
     parse_status_file, 
     parse_rps_file, 
-    parse_audit_logs_file
+    parse_audit_logs_file_all
 )
 
 
-def save_comparative_boxplot(data_km, data_pk8s, title, ylabel, filename, directory):
+# Resolution of the saved plots (set PLOT_DPI=300 for publication-quality figures)
+PLOT_DPI = int(os.environ.get('PLOT_DPI', 150))
+
+
+def _mean_std(values):
+    """
+    Compute mean and (population) standard deviation of a metric with a single array conversion.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.size == 0:
+        return math.nan, math.nan
+    return arr.mean(), np.std(arr)
+
+
+def save_comparative_boxplot(ax, data_km, data_pk8s, title, ylabel, filename, directory):
     """
     Create a comparative boxplot with two boxes total (kube-manager and preempt-k8s).
     Data is aggregated across all services and iterations.
+    The given axes are cleared and reused, so the same figure can serve several plots.
     """
-    fig, ax = plt.subplots(figsize=(5, 6))
+    ax.clear()
     
     # Prepare data - two boxes total
     all_data = [data_km, data_pk8s]
@@ -46,22 +63,22 @@ def save_comparative_boxplot(data_km, data_pk8s, title, ylabel, filename, direct
     ax.set_ylabel(ylabel, fontsize=12)
     ax.set_title(title, fontsize=14, fontweight='bold')
     
-    plt.tight_layout()
+    ax.figure.tight_layout()
     plot_path = os.path.join(directory, filename)
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.figure.savefig(plot_path, dpi=PLOT_DPI)
     print(f"{title} saved to: {plot_path}")
 
 
-def save_comparative_cdf_plot(data_km, data_pk8s, title, xlabel, filename, directory):
+def save_comparative_cdf_plot(ax, data_km, data_pk8s, title, xlabel, filename, directory):
     """
     Create comparative CDF plots with two lines total (kube-manager and preempt-k8s).
-    Data is aggregated across all services and iterations.
+    Data is aggregated across all services and iterations, and must be already sorted.
+    The given axes are cleared and reused, so the same figure can serve several plots.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.clear()
     
     # CDF for kube-manager
-    sorted_data_km = np.sort(data_km)
+    sorted_data_km = data_km
     if len(sorted_data_km) > 0:
         cdf_km = np.arange(1, len(sorted_data_km) + 1) / len(sorted_data_km)
         ax.plot(sorted_data_km, cdf_km, 
@@ -71,7 +88,7 @@ def save_comparative_cdf_plot(data_km, data_pk8s, title, xlabel, filename, direc
                 linewidth=2.5)
     
     # CDF for preempt-k8s
-    sorted_data_pk8s = np.sort(data_pk8s)
+    sorted_data_pk8s = data_pk8s
     if len(sorted_data_pk8s) > 0:
         cdf_pk8s = np.arange(1, len(sorted_data_pk8s) + 1) / len(sorted_data_pk8s)
         ax.plot(sorted_data_pk8s, cdf_pk8s, 
@@ -86,18 +103,30 @@ def save_comparative_cdf_plot(data_km, data_pk8s, title, xlabel, filename, direc
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.legend(loc='best', fontsize=10)
     
-    plt.tight_layout()
+    ax.figure.tight_layout()
     plot_path = os.path.join(directory, filename)
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.figure.savefig(plot_path, dpi=PLOT_DPI)
     print(f"{title} saved to: {plot_path}")
 
 
+def _parse_audit_logs_task(audit_file, controller_name, service_ids):
+    """
+    Parse an audit logs file for all services in a worker process.
+    Returns an empty dict if the file cannot be parsed.
+    """
+    try:
+        return parse_audit_logs_file_all(audit_file, controller_name, service_ids)
+    except Exception as e:
+        print(f"    Error processing {audit_file}: {str(e)}")
+        return {}
+
+
 def process_experiment_data(root_path, num_services, controller_name):
     """
     Process experiment data for a single controller.
     Returns dictionaries with all metrics aggregated by iteration.
     Each value represents the aggregate (sum or mean) across all services for that iteration.
+    Every metric is returned as a sorted ndarray.
     """
     print(f"\n{'='*60}")
     print(f"Processing {controller_name} data from: {root_path}")
@@ -111,22 +140,24 @@ def process_experiment_data(root_path, num_services, controller_name):
         service_path = os.path.join(root_path, service_name)
         
         if os.path.isdir(service_path):
-            all_files = os.listdir(service_path)
+            # (name, full path) pairs in iteration order, so the iteration loop only indexes them
+            with os.scandir(service_path) as entries:
+                all_files = [(entry.name, entry.path) for entry in entries if entry.is_file()]
             status_files[service_name] = sorted(
-                [f for f in all_files if f.endswith("status.txt") and os.path.isfile(os.path.join(service_path, f))],
-                key=lambda fname: int(fname.split('_')[1])
+                [f for f in all_files if f[0].endswith("status.txt")],
+                key=lambda f: int(f[0].split('_')[1])
                 )
             rps_files[service_name] = sorted(
-                [f for f in all_files if f.startswith("rps") and os.path.isfile(os.path.join(service_path, f))],
-                key=lambda fname: int(fname.split('_')[-1])
+                [f for f in all_files if f[0].startswith("rps")],
+                key=lambda f: int(f[0].split('_')[-1])
                 )
     
     # Collect audit logs files
-    all_audit_files = os.listdir(root_path)
-    audit_files = sorted(
-        [os.path.join(root_path, f) for f in all_audit_files if f.startswith("loki-logs-iteration") and os.path.isfile(os.path.join(root_path, f))],
-        key=lambda fname: int(fname.split('iteration_')[1].split('.json')[0])
-        )
+    with os.scandir(root_path) as entries:
+        audit_files = sorted(
+            [entry.path for entry in entries if entry.name.startswith("loki-logs-iteration") and entry.is_file()],
+            key=lambda fname: int(fname.split('iteration_')[1].split('.json')[0])
+            )
     
     print(f"Found {len(audit_files)} audit logs files")
     
@@ -138,34 +169,48 @@ def process_experiment_data(root_path, num_services, controller_name):
     all_starts_processing_delays = []
     all_pod_creation_delays = []
     all_pod_startup_delays = []
+    service_ids = [f"aes-python-{i+1}" for i in range(num_services)]
     
-    for iter_idx, audit_file in enumerate(audit_files):
+    # With Deployments, processing starts when the pod is created
+    if controller_name == "preempt-k8s":
+        starts_processing_key = 'starts_processing_timestamp'
+    else:
+        starts_processing_key = 'pod_created_timestamp'
+    
+    # Audit logs files are independent, so parse them in parallel, once for all services
+    with ProcessPoolExecutor() as executor:
+        parsed_audit_files = list(executor.map(_parse_audit_logs_task, audit_files, repeat(controller_name), repeat(service_ids)))
+    
+    for iter_idx, (audit_file, services_metrics) in enumerate(zip(audit_files, parsed_audit_files)):
         print(f"  Processing iteration {iter_idx + 1}: {audit_file}")
         
-        # Temporary lists to collect data from all services for this iteration
-        iteration_starts_processing_delays = []
-        iteration_pod_creation_delays = []
-        iteration_pod_start_delays = []
+        # Timestamps of each service for this iteration: scale-up, starts processing, pod created, pod started
+        timestamps = []
         
-        for i in range(num_services):
-            service_id = f"aes-python-{i+1}"
+        for service_id in service_ids:
+            metrics = services_metrics.get(service_id)
+            if isinstance(metrics, Exception):
+                print(f"    Error processing {service_id}: {str(metrics)}")
+                continue
             try:
-                metrics = parse_audit_logs_file(audit_file, controller_name, service_id)
                 if metrics:
-                    # Calculate delays (converting nanoseconds to milliseconds)
-                    if controller_name == "preempt-k8s":
-                        iteration_starts_processing_delays.append((metrics['starts_processing_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    elif controller_name == "kube-manager":
-                        iteration_starts_processing_delays.append((metrics['pod_created_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    iteration_pod_creation_delays.append((metrics['pod_created_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    iteration_pod_start_delays.append((metrics['pod_started_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
+                    timestamps.append((
+                        metrics['scale_up_timestamp'],
+                        metrics[starts_processing_key],
+                        metrics['pod_created_timestamp'],
+                        metrics['pod_started_timestamp']
+                    ))
             except Exception as e:
                 print(f"    Error processing {service_id}: {str(e)}")
         
         # Aggregate data across all services for this iteration (average)
-        mean_starts_processing = sum(iteration_starts_processing_delays) / len(iteration_starts_processing_delays) if iteration_starts_processing_delays else 0
-        mean_pod_creation = sum(iteration_pod_creation_delays) / len(iteration_pod_creation_delays) if iteration_pod_creation_delays else 0
-        mean_pod_start = sum(iteration_pod_start_delays) / len(iteration_pod_start_delays) if iteration_pod_start_delays else 0
+        # Calculate all delays at once (converting nanoseconds to milliseconds)
+        timestamps = np.asarray(timestamps, dtype=np.int64).reshape(-1, 4)
+        if len(timestamps):
+            delays = (timestamps[:, 1:] - timestamps[:, :1]) / 1_000_000
+            mean_starts_processing, mean_pod_creation, mean_pod_start = delays.mean(axis=0)
+        else:
+            mean_starts_processing = mean_pod_creation = mean_pod_start = 0
         
         all_starts_processing_delays.append(mean_starts_processing)
         all_pod_creation_delays.append(mean_pod_creation)
@@ -182,50 +227,47 @@ def process_experiment_data(root_path, num_services, controller_name):
     for iter_idx in range(num_iterations):
         print(f"  Processing iteration {iter_idx + 1}")
         
-        # Temporary lists to collect data from all services for this iteration
-        iteration_lost_requests = []
-        iteration_completed_requests = []
+        # Requests of each service for this iteration (0 for services without a valid status file)
+        iteration_lost_requests = np.zeros(num_services, dtype=np.int64)
+        iteration_completed_requests = np.zeros(num_services, dtype=np.int64)
+        iteration_real_rps = np.zeros(num_services, dtype=np.float64)
+        # One latency array per service
         iteration_all_latencies = []
-        iteration_real_rps = []
         
         for i in range(num_services):
             service_name = f"service-{i+1}"
             
             # Process status file for this iteration
             if iter_idx < len(status_files[service_name]):
-                status_file = status_files[service_name][iter_idx]
-                file_path = os.path.join(root_path, service_name, status_file)
+                status_file, file_path = status_files[service_name][iter_idx]
                 try:
                     status_data = parse_status_file(file_path)
-                    lost = status_data['issued'] - status_data['completed']
-                    iteration_lost_requests.append(lost)
-                    iteration_completed_requests.append(status_data['completed'])
-                    iteration_real_rps.append(status_data['real_rps'])
+                    iteration_lost_requests[i] = status_data['issued'] - status_data['completed']
+                    iteration_completed_requests[i] = status_data['completed']
+                    iteration_real_rps[i] = status_data['real_rps']
                 except Exception as e:
                     print(f"    Error parsing {status_file}: {str(e)}")
             
             # Process rps file for this iteration - accumulate ALL latencies
             if iter_idx < len(rps_files[service_name]):
-                rps_file = rps_files[service_name][iter_idx]
-                file_path = os.path.join(root_path, service_name, rps_file)
+                rps_file, file_path = rps_files[service_name][iter_idx]
                 try:
-                    latencies = parse_rps_file(file_path)
-                    iteration_all_latencies.extend(latencies)
+                    iteration_all_latencies.append(parse_rps_file(file_path))
                 except Exception as e:
                     print(f"    Error parsing {rps_file}: {str(e)}")
         
         # Aggregate data across all services for this iteration
         # Sum for requests (total across all services)
-        total_lost = sum(iteration_lost_requests) if iteration_lost_requests else 0
-        total_completed = sum(iteration_completed_requests) if iteration_completed_requests else 0
-        total_real_rps = sum(iteration_real_rps) if iteration_real_rps else 0
+        total_lost = iteration_lost_requests.sum()
+        total_completed = iteration_completed_requests.sum()
+        total_real_rps = iteration_real_rps.sum()
         
         # Calculate mean and max on ALL latencies from all services
         if iteration_all_latencies:
-            # Convert from microseconds to milliseconds
-            iteration_all_latencies_ms = [lat / 1000 for lat in iteration_all_latencies]
-            mean_latency = sum(iteration_all_latencies_ms) / len(iteration_all_latencies_ms)
-            max_latency = max(iteration_all_latencies_ms)
+            # Join the per-service arrays and convert from microseconds to milliseconds
+            iteration_all_latencies_ms = np.concatenate(iteration_all_latencies) / 1000
+            mean_latency = iteration_all_latencies_ms.mean()
+            max_latency = iteration_all_latencies_ms.max()
         else:
             mean_latency = 0
             max_latency = 0
@@ -237,7 +279,7 @@ def process_experiment_data(root_path, num_services, controller_name):
         all_mean_latencies.append(mean_latency)
         all_max_latencies.append(max_latency)
     
-    return {
+    metrics = {
         'starts_processing_delays': all_starts_processing_delays,
         'pod_creation_delays': all_pod_creation_delays,
         'pod_startup_delays': all_pod_startup_delays,
@@ -247,6 +289,9 @@ def process_experiment_data(root_path, num_services, controller_name):
         'mean_latencies': all_mean_latencies,
         'max_latencies': all_max_latencies
     }
+    
+    # Sort every metric once: the CDF plots need sorted data, box plots and statistics are order independent
+    return {metric_key: np.sort(np.asarray(values, dtype=np.float64)) for metric_key, values in metrics.items()}
 
 
 def main():
@@ -294,7 +339,7 @@ def main():
     km_data = process_experiment_data(km_path, num_services, "kube-manager")
     pk8s_data = process_experiment_data(pk8s_path, num_services, "preempt-k8s")
     
-    # km_data and pk8s_data contain lists with one value per iteration
+    # km_data and pk8s_data map each metric to a sorted float64 array with one value per iteration
     km_flat = km_data
     pk8s_flat = pk8s_data
     
@@ -317,50 +362,28 @@ def main():
             'Mean Pod Startup Delay [ms]', 'Std Pod Startup Delay [ms]'
         ])
         
-        # kube-manager row
-        writer.writerow([
-            'kube-manager',
-            np.mean(km_flat['mean_latencies']),
-            np.std(km_flat['mean_latencies']),
-            np.mean(km_flat['max_latencies']),
-            np.std(km_flat['max_latencies']),
-            np.mean(km_flat['lost_requests']),
-            np.std(km_flat['lost_requests']),
-            np.mean(km_flat['completed_requests']),
-            np.std(km_flat['completed_requests']),
-            np.mean(km_flat['real_rps']),
-            np.std(km_flat['real_rps']),
-            np.mean(km_flat['starts_processing_delays']),
-            np.std(km_flat['starts_processing_delays']),
-            np.mean(km_flat['pod_creation_delays']),
-            np.std(km_flat['pod_creation_delays']),
-            np.mean(km_flat['pod_startup_delays']),
-            np.std(km_flat['pod_startup_delays'])
-        ])
+        # Metric columns in header order, each expanded into (mean, std)
+        columns = [
+            'mean_latencies', 'max_latencies',
+            'lost_requests', 'completed_requests', 'real_rps',
+            'starts_processing_delays', 'pod_creation_delays', 'pod_startup_delays'
+        ]
         
-        # preempt-k8s row
-        writer.writerow([
-            'preempt-k8s',
-            np.mean(pk8s_flat['mean_latencies']),
-            np.std(pk8s_flat['mean_latencies']),
-            np.mean(pk8s_flat['max_latencies']),
-            np.std(pk8s_flat['max_latencies']),
-            np.mean(pk8s_flat['lost_requests']),
-            np.std(pk8s_flat['lost_requests']),
-            np.mean(pk8s_flat['completed_requests']),
-            np.std(pk8s_flat['completed_requests']),
-            np.mean(pk8s_flat['real_rps']),
-            np.std(pk8s_flat['real_rps']),
-            np.mean(pk8s_flat['starts_processing_delays']),
-            np.std(pk8s_flat['starts_processing_delays']),
-            np.mean(pk8s_flat['pod_creation_delays']),
-            np.std(pk8s_flat['pod_creation_delays']),
-            np.mean(pk8s_flat['pod_startup_delays']),
-            np.std(pk8s_flat['pod_startup_delays'])
-        ])
+        rows = []
+        for controller_name, data in (('kube-manager', km_flat), ('preempt-k8s', pk8s_flat)):
+            row = [controller_name]
+            for metric_key in columns:
+                row.extend(_mean_std(data[metric_key]))
+            rows.append(row)
+        writer.writerows(rows)
     
     print(f"CSV saved to: {csv_path}")
     
+    # matplotlib is only imported once the data is ready, with the non-interactive backend
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
     # Create comparative box plots
     print("\n" + "="*60)
     print("Creating comparative box plots...")
@@ -377,8 +400,11 @@ def main():
         ('max_latencies', "Comparative Max Latencies", "Latencies [ms]", "comparative_boxplot_max_latencies.png")
     ]
     
+    # One figure per plot type, reused for every metric
+    box_fig, box_ax = plt.subplots(figsize=(5, 6))
     for metric_key, title, ylabel, fname in box_plots_config:
         save_comparative_boxplot(
+            box_ax,
             km_flat[metric_key], 
             pk8s_flat[metric_key], 
             title, 
@@ -386,6 +412,7 @@ def main():
             fname, 
             str(output_dir)
         )
+    plt.close(box_fig)
     
     # Create comparative CDF plots
     print("\n" + "="*60)
@@ -400,8 +427,10 @@ def main():
         ('max_latencies', "Comparative CDF of Max Latencies", "Max Latencies [ms]", "comparative_cdf_max_latencies.png")
     ]
     
+    cdf_fig, cdf_ax = plt.subplots(figsize=(10, 6))
     for metric_key, title, xlabel, fname in cdf_plots_config:
         save_comparative_cdf_plot(
+            cdf_ax,
             km_flat[metric_key], 
             pk8s_flat[metric_key], 
             title, 
@@ -409,6 +438,7 @@ def main():
             fname, 
             str(output_dir)
         )
+    plt.close(cdf_fig)
     
     print("\n" + "="*60)
     print("Comparison completed successfully!")
@@ -1,13 +1,13 @@
 import os
 import sys
-from matplotlib.ticker import FuncFormatter
-import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from results import (
     parse_status_file, 
     parse_rps_file, 
-    parse_audit_logs_file
+    parse_audit_logs_file_all
 )
 
 
@@ -18,6 +18,9 @@ def save_comparative_boxplot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30,
     Create a sensitivity analysis boxplot with 6 boxes (3 parameter values x 2 controllers).
     Shows how metrics vary with parameter values (15, 30, 45) for both controllers.
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FuncFormatter
+    
     # Set professional style
     plt.rcParams['font.family'] = 'sans-serif'
     plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'Helvetica']
@@ -28,12 +31,12 @@ def save_comparative_boxplot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30,
     # Converti i dati da ms a secondi
     # Scale data according to provided scale_factor (e.g., 1000.0 to convert ms->s, 1.0 to keep counts/RPS)
     all_data = [
-        np.array(data_km_15) / scale_factor,
-        np.array(data_pk8s_15) / scale_factor,
-        np.array(data_km_30) / scale_factor,
-        np.array(data_pk8s_30) / scale_factor,
-        np.array(data_km_45) / scale_factor,
-        np.array(data_pk8s_45) / scale_factor
+        np.asarray(data_km_15) / scale_factor,
+        np.asarray(data_pk8s_15) / scale_factor,
+        np.asarray(data_km_30) / scale_factor,
+        np.asarray(data_pk8s_30) / scale_factor,
+        np.asarray(data_km_45) / scale_factor,
+        np.asarray(data_pk8s_45) / scale_factor
     ]
     positions = [1, 2, 4, 5, 7, 8]  # Grouped positions
     
@@ -174,7 +177,11 @@ def save_comparative_cdf_plot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30
     """
     Create sensitivity analysis CDF plots with 6 lines (3 parameter values x 2 controllers).
     Shows how CDFs vary with parameter values (15, 30, 45) for both controllers.
+    Data must be already sorted.
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FuncFormatter
+    
     # Set professional style
     plt.rcParams['font.family'] = 'sans-serif'
     plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'Helvetica']
@@ -213,7 +220,7 @@ def save_comparative_cdf_plot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30
             (data_pk8s, "Preempt-K8s", color_pk8s, marker_pk8s)
         ]:
 
-            sorted_data = np.sort(data)
+            sorted_data = data
             if len(sorted_data) > 0:
                 cdf = np.arange(1, len(sorted_data) + 1) / len(sorted_data)
 
@@ -228,19 +235,19 @@ def save_comparative_cdf_plot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30
                         linewidth=4.0,
                         alpha=0.95)
 
-                # Add markers at key percentiles
-                percentiles = [0.25, 0.50, 0.75, 0.95]
-                for p in percentiles:
-                    idx = int(p * len(sorted_data))
-                    if idx < len(sorted_data):
-                        ax.plot(sorted_data[idx],
-                                cdf[idx],
-                                marker=marker,
-                                markersize=15,
-                                color=color,
-                                markeredgecolor='white',
-                                markeredgewidth=1.5,
-                                zorder=5)
+                # Add markers at key percentiles, drawn as a single line artist
+                percentiles = np.array([0.25, 0.50, 0.75, 0.95])
+                idx = (percentiles * len(sorted_data)).astype(int)
+                idx = idx[idx < len(sorted_data)]
+                ax.plot(sorted_data[idx],
+                        cdf[idx],
+                        linestyle='None',
+                        marker=marker,
+                        markersize=15,
+                        color=color,
+                        markeredgecolor='white',
+                        markeredgewidth=1.5,
+                        zorder=5)
 
         # Parameter label inside subplot
         ax.text(0.98, 0.20, f"{label}",
@@ -317,11 +324,24 @@ def save_comparative_cdf_plot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30
     print(f"CDF Plot saved to: {plot_path_png}")
 
 
+def _parse_audit_logs_task(audit_file, controller_name, service_ids):
+    """
+    Parse an audit logs file for all services in a worker process.
+    Returns an empty dict if the file cannot be parsed.
+    """
+    try:
+        return parse_audit_logs_file_all(audit_file, controller_name, service_ids)
+    except Exception as e:
+        print(f"    Error processing {audit_file}: {str(e)}")
+        return {}
+
+
 def process_experiment_data(root_path, num_services, controller_name):
     """
     Process experiment data for a single controller.
     Returns dictionaries with all metrics aggregated by iteration.
     Each value represents the aggregate (sum or mean) across all services for that iteration.
+    Every metric is returned as a sorted ndarray.
     """
     print(f"\n{'='*60}")
     print(f"Processing {controller_name} data from: {root_path}")
@@ -335,22 +355,24 @@ def process_experiment_data(root_path, num_services, controller_name):
         service_path = os.path.join(root_path, service_name)
         
         if os.path.isdir(service_path):
-            all_files = os.listdir(service_path)
+            # (name, full path) pairs in iteration order, so the iteration loop only indexes them
+            with os.scandir(service_path) as entries:
+                all_files = [(entry.name, entry.path) for entry in entries if entry.is_file()]
             status_files[service_name] = sorted(
-                [f for f in all_files if f.endswith("status.txt") and os.path.isfile(os.path.join(service_path, f))],
-                key=lambda fname: int(fname.split('_')[1])
+                [f for f in all_files if f[0].endswith("status.txt")],
+                key=lambda f: int(f[0].split('_')[1])
                 )
             rps_files[service_name] = sorted(
-                [f for f in all_files if f.startswith("rps") and os.path.isfile(os.path.join(service_path, f))],
-                key=lambda fname: int(fname.split('_')[-1])
+                [f for f in all_files if f[0].startswith("rps")],
+                key=lambda f: int(f[0].split('_')[-1])
                 )
     
     # Collect audit logs files
-    all_audit_files = os.listdir(root_path)
-    audit_files = sorted(
-        [os.path.join(root_path, f) for f in all_audit_files if f.startswith("loki-logs-iteration") and os.path.isfile(os.path.join(root_path, f))],
-        key=lambda fname: int(fname.split('iteration_')[1].split('.json')[0])
-        )
+    with os.scandir(root_path) as entries:
+        audit_files = sorted(
+            [entry.path for entry in entries if entry.name.startswith("loki-logs-iteration") and entry.is_file()],
+            key=lambda fname: int(fname.split('iteration_')[1].split('.json')[0])
+            )
     
     print(f"Found {len(audit_files)} audit logs files")
     
@@ -362,34 +384,48 @@ def process_experiment_data(root_path, num_services, controller_name):
     all_starts_processing_delays = []
     all_pod_creation_delays = []
     all_pod_startup_delays = []
+    service_ids = [f"aes-python-{i+1}" for i in range(num_services)]
+    
+    # With Deployments, processing starts when the pod is created
+    if controller_name == "preempt-k8s":
+        starts_processing_key = 'starts_processing_timestamp'
+    else:
+        starts_processing_key = 'pod_created_timestamp'
+    
+    # Audit logs files are independent, so parse them in parallel, once for all services
+    with ProcessPoolExecutor() as executor:
+        parsed_audit_files = list(executor.map(_parse_audit_logs_task, audit_files, repeat(controller_name), repeat(service_ids)))
     
-    for iter_idx, audit_file in enumerate(audit_files):
+    for iter_idx, (audit_file, services_metrics) in enumerate(zip(audit_files, parsed_audit_files)):
         print(f"  Processing iteration {iter_idx + 1}: {audit_file}")
         
-        # Temporary lists to collect data from all services for this iteration
-        iteration_starts_processing_delays = []
-        iteration_pod_creation_delays = []
-        iteration_pod_start_delays = []
+        # Timestamps of each service for this iteration: scale-up, starts processing, pod created, pod started
+        timestamps = []
         
-        for i in range(num_services):
-            service_id = f"aes-python-{i+1}"
+        for service_id in service_ids:
+            metrics = services_metrics.get(service_id)
+            if isinstance(metrics, Exception):
+                print(f"    Error processing {service_id}: {str(metrics)}")
+                continue
             try:
-                metrics = parse_audit_logs_file(audit_file, controller_name, service_id)
                 if metrics:
-                    # Calculate delays (converting nanoseconds to milliseconds)
-                    if controller_name == "preempt-k8s":
-                        iteration_starts_processing_delays.append((metrics['starts_processing_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    elif controller_name == "kube-manager":
-                        iteration_starts_processing_delays.append((metrics['pod_created_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    iteration_pod_creation_delays.append((metrics['pod_created_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    iteration_pod_start_delays.append((metrics['pod_started_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
+                    timestamps.append((
+                        metrics['scale_up_timestamp'],
+                        metrics[starts_processing_key],
+                        metrics['pod_created_timestamp'],
+                        metrics['pod_started_timestamp']
+                    ))
             except Exception as e:
                 print(f"    Error processing {service_id}: {str(e)}")
         
         # Aggregate data across all services for this iteration (average)
-        mean_starts_processing = sum(iteration_starts_processing_delays) / len(iteration_starts_processing_delays) if iteration_starts_processing_delays else 0
-        mean_pod_creation = sum(iteration_pod_creation_delays) / len(iteration_pod_creation_delays) if iteration_pod_creation_delays else 0
-        mean_pod_start = sum(iteration_pod_start_delays) / len(iteration_pod_start_delays) if iteration_pod_start_delays else 0
+        # Calculate all delays at once (converting nanoseconds to milliseconds)
+        timestamps = np.asarray(timestamps, dtype=np.int64).reshape(-1, 4)
+        if len(timestamps):
+            delays = (timestamps[:, 1:] - timestamps[:, :1]) / 1_000_000
+            mean_starts_processing, mean_pod_creation, mean_pod_start = delays.mean(axis=0)
+        else:
+            mean_starts_processing = mean_pod_creation = mean_pod_start = 0
         
         all_starts_processing_delays.append(mean_starts_processing)
         all_pod_creation_delays.append(mean_pod_creation)
@@ -406,50 +442,47 @@ def process_experiment_data(root_path, num_services, controller_name):
     for iter_idx in range(num_iterations):
         print(f"  Processing iteration {iter_idx + 1}")
         
-        # Temporary lists to collect data from all services for this iteration
-        iteration_lost_requests = []
-        iteration_completed_requests = []
+        # Requests of each service for this iteration (0 for services without a valid status file)
+        iteration_lost_requests = np.zeros(num_services, dtype=np.int64)
+        iteration_completed_requests = np.zeros(num_services, dtype=np.int64)
+        iteration_real_rps = np.zeros(num_services, dtype=np.float64)
+        # One latency array per service
         iteration_all_latencies = []
-        iteration_real_rps = []
         
         for i in range(num_services):
             service_name = f"service-{i+1}"
             
             # Process status file for this iteration
             if iter_idx < len(status_files[service_name]):
-                status_file = status_files[service_name][iter_idx]
-                file_path = os.path.join(root_path, service_name, status_file)
+                status_file, file_path = status_files[service_name][iter_idx]
                 try:
                     status_data = parse_status_file(file_path)
-                    lost = status_data['issued'] - status_data['completed']
-                    iteration_lost_requests.append(lost)
-                    iteration_completed_requests.append(status_data['completed'])
-                    iteration_real_rps.append(status_data['real_rps'])
+                    iteration_lost_requests[i] = status_data['issued'] - status_data['completed']
+                    iteration_completed_requests[i] = status_data['completed']
+                    iteration_real_rps[i] = status_data['real_rps']
                 except Exception as e:
                     print(f"    Error parsing {status_file}: {str(e)}")
             
             # Process rps file for this iteration - accumulate ALL latencies
             if iter_idx < len(rps_files[service_name]):
-                rps_file = rps_files[service_name][iter_idx]
-                file_path = os.path.join(root_path, service_name, rps_file)
+                rps_file, file_path = rps_files[service_name][iter_idx]
                 try:
-                    latencies = parse_rps_file(file_path)
-                    iteration_all_latencies.extend(latencies)
+                    iteration_all_latencies.append(parse_rps_file(file_path))
                 except Exception as e:
                     print(f"    Error parsing {rps_file}: {str(e)}")
         
         # Aggregate data across all services for this iteration
         # Sum for requests (total across all services)
-        total_lost = sum(iteration_lost_requests) if iteration_lost_requests else 0
-        total_completed = sum(iteration_completed_requests) if iteration_completed_requests else 0
-        total_real_rps = sum(iteration_real_rps) if iteration_real_rps else 0
+        total_lost = iteration_lost_requests.sum()
+        total_completed = iteration_completed_requests.sum()
+        total_real_rps = iteration_real_rps.sum()
         
         # Calculate mean and max on ALL latencies from all services
         if iteration_all_latencies:
-            # Convert from microseconds to milliseconds
-            iteration_all_latencies_ms = [lat / 1000 for lat in iteration_all_latencies]
-            mean_latency = sum(iteration_all_latencies_ms) / len(iteration_all_latencies_ms)
-            max_latency = max(iteration_all_latencies_ms)
+            # Join the per-service arrays and convert from microseconds to milliseconds
+            iteration_all_latencies_ms = np.concatenate(iteration_all_latencies) / 1000
+            mean_latency = iteration_all_latencies_ms.mean()
+            max_latency = iteration_all_latencies_ms.max()
         else:
             mean_latency = 0
             max_latency = 0
@@ -461,7 +494,7 @@ def process_experiment_data(root_path, num_services, controller_name):
         all_mean_latencies.append(mean_latency)
         all_max_latencies.append(max_latency)
     
-    return {
+    metrics = {
         'starts_processing_delays': all_starts_processing_delays,
         'pod_creation_delays': all_pod_creation_delays,
         'pod_startup_delays': all_pod_startup_delays,
@@ -471,6 +504,9 @@ def process_experiment_data(root_path, num_services, controller_name):
         'mean_latencies': all_mean_latencies,
         'max_latencies': all_max_latencies
     }
+    
+    # Sort every metric once: the CDF plots need sorted data, box plots and statistics are order independent
+    return {metric_key: np.sort(np.asarray(values, dtype=np.float64)) for metric_key, values in metrics.items()}
 
 
 def main():
@@ -521,6 +557,10 @@ def main():
         print("Error: Number of services must be a positive integer!")
         sys.exit(1)
     
+    # Plots are only saved to files, so use the non-interactive backend
+    import matplotlib
+    matplotlib.use('Agg')
+    
     # Create output directory for sensitivity analysis
     output_dir = Path(f"results/sensitivity-analysis/sensitivity-analysis-{num_services}-services")
     if not output_dir.exists():
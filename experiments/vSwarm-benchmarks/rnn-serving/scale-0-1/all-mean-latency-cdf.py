@@ -1,7 +1,5 @@
 import os
 import sys
-from matplotlib.ticker import FuncFormatter, MaxNLocator
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 from pathlib import Path
@@ -31,7 +29,11 @@ def save_comparative_cdf_plot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30
     """
     Create sensitivity analysis CDF plots with 6 lines (3 parameter values x 2 controllers).
     Shows how CDFs vary with parameter values (15, 30, 45) for both controllers.
+    Data must be already sorted.
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FuncFormatter, MaxNLocator
+    
     # Set professional style
     plt.rcParams['font.family'] = 'sans-serif'
     plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'Helvetica']
@@ -74,7 +76,7 @@ def save_comparative_cdf_plot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30
             (data_pk8s, "Preempt-K8s", color_pk8s, marker_pk8s)
         ]:
 
-            sorted_data = np.sort(data)
+            sorted_data = data
             if len(sorted_data) > 0:
                 cdf = np.arange(1, len(sorted_data) + 1) / len(sorted_data)
 
@@ -89,19 +91,19 @@ def save_comparative_cdf_plot(data_km_15, data_pk8s_15, data_km_30, data_pk8s_30
                         linewidth=7.0,
                         alpha=0.95)
 
-                # Add markers at key percentiles
-                percentiles = [0.25, 0.50, 0.75, 0.95]
-                for p in percentiles:
-                    idx = int(p * len(sorted_data))
-                    if idx < len(sorted_data):
-                        ax.plot(sorted_data[idx],
-                                cdf[idx],
-                                marker=marker,
-                                markersize=20,
-                                color=color,
-                                markeredgecolor='white',
-                                markeredgewidth=1.5,
-                                zorder=5)
+                # Add markers at key percentiles, drawn as a single line artist
+                percentiles = np.array([0.25, 0.50, 0.75, 0.95])
+                idx = (percentiles * len(sorted_data)).astype(int)
+                idx = idx[idx < len(sorted_data)]
+                ax.plot(sorted_data[idx],
+                        cdf[idx],
+                        linestyle='None',
+                        marker=marker,
+                        markersize=20,
+                        color=color,
+                        markeredgecolor='white',
+                        markeredgewidth=1.5,
+                        zorder=5)
 
         # Parameter label: use it as the subplot title (aligned right)
         ax.set_title(f"{label}", fontsize=35, fontweight='bold', loc='center')
@@ -183,7 +185,7 @@ def process_experiment_data(root_path, num_services, controller_name):
     """
     Process experiment data for a single controller.
     Returns dictionaries with all metrics aggregated by iteration.
-    Each value represents the aggregate (sum or mean) across all services for that iteration.
+    Returns all latencies of all services and iterations as a sorted ndarray, in milliseconds.
     """
     print(f"\n{'='*60}")
     print(f"Processing {controller_name} data from: {root_path}")
@@ -196,42 +198,40 @@ def process_experiment_data(root_path, num_services, controller_name):
         service_path = os.path.join(root_path, service_name)
         
         if os.path.isdir(service_path):
-            all_files = os.listdir(service_path)
-            rps_files[service_name] = sorted([f for f in all_files if f.startswith("rps") and os.path.isfile(os.path.join(service_path, f))])
+            # (name, full path) pairs, so the iteration loop only indexes them
+            with os.scandir(service_path) as entries:
+                rps_files[service_name] = sorted((entry.name, entry.path) for entry in entries if entry.name.startswith("rps") and entry.is_file())
     
     # Determine number of iterations
     num_iterations = 30
     
     # Process status and rps files - organized by iteration
     print("\nProcessing status and rps files...")
-    all_mean_latencies = []
+    # One latency array per service and iteration
+    all_latencies = []
     
     for iter_idx in range(num_iterations):
         print(f"  Processing iteration {iter_idx + 1}")
         
-        # Temporary lists to collect data from all services for this iteration
-        iteration_all_latencies = []
-        
         for i in range(num_services):
             service_name = f"service-{i+1}"
             
             # Process rps file for this iteration - accumulate ALL latencies
             if iter_idx < len(rps_files[service_name]):
-                rps_file = rps_files[service_name][iter_idx]
-                file_path = os.path.join(root_path, service_name, rps_file)
+                rps_file, file_path = rps_files[service_name][iter_idx]
                 try:
-                    latencies = parse_rps_file(file_path)
-                    iteration_all_latencies.extend(latencies)
+                    all_latencies.append(parse_rps_file(file_path))
                 except Exception as e:
                     print(f"    Error parsing {rps_file}: {str(e)}")
-        
-        # Convert from microseconds to milliseconds
-        iteration_all_latencies_ms = [lat / 1000 for lat in iteration_all_latencies]
-        
-        # Append values for this iteration
-        all_mean_latencies.extend(iteration_all_latencies_ms)
     
-    return all_mean_latencies
+    if not all_latencies:
+        return np.empty(0)
+    
+    # Join the per-file arrays once and convert from microseconds to milliseconds
+    all_latencies_ms = np.concatenate(all_latencies) / 1000
+    # Sort once for the CDF plot
+    all_latencies_ms.sort()
+    return all_latencies_ms
 
 
 def main():
@@ -282,6 +282,10 @@ def main():
         print("Error: Number of services must be a positive integer!")
         sys.exit(1)
     
+    # Plots are only saved to files, so use the non-interactive backend
+    import matplotlib
+    matplotlib.use('Agg')
+    
     # Create output directory for sensitivity analysis
     output_dir = Path(f"results/sensitivity-analysis/sensitivity-analysis-{num_services}-services")
     if not output_dir.exists():
@@ -300,7 +304,7 @@ def main():
 
     # print 50th percentiles (median) for each dataset
     def print_median(data, label):
-        if data:
+        if data.size:
             p50 = np.percentile(data, 50)
             p95 = np.percentile(data, 95)
             print(f"{label} 50th percentile = {p50:.2f} ms")
@@ -1,14 +1,33 @@
 import sys
 import os
-import json
 import re
 import glob
 import textwrap
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.lines import Line2D
+from matplotlib.collections import LineCollection
 from matplotlib.ticker import MultipleLocator
 import numpy as np
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from results import (
+    load_audit_entries, 
+    audit_event_type, 
+    SCALE_UP_EVENT, 
+    STARTS_PROCESSING_EVENT, 
+    POD_CREATED_EVENT, 
+    POD_STARTED_EVENT
+)
+
+# Iteration number in the audit logs file names
+ITERATION_RE = re.compile(r'iteration_(\d+)')
+
+# Replicas set by the autoscaler patch the plotted scale-up is measured from
+SCALE_UP_REPLICAS = 1
+
+# Resolution of the saved plots (set PLOT_DPI=300 for publication-quality figures)
+PLOT_DPI = int(os.environ.get('PLOT_DPI', 150))
 
 
 def parse_audit_logs_file(file_path, controller, service):
@@ -28,12 +47,8 @@ def parse_audit_logs_file(file_path, controller, service):
     elif controller == "kube-manager":
         service_name = f"{service}-00001-deployment"
 
-    # Load audit logs
-    with open(file_path, 'r') as f:
-        audit_data = json.load(f)
-    
-    # Sort logs by timestamp
-    audit_data.sort(key=lambda x: int(x.get('timestamp', '0')))
+    # Load audit logs sorted by timestamp
+    audit_data = load_audit_entries(file_path)
 
     # Initialize metrics dictionary
     service_metrics = {}
@@ -41,11 +56,9 @@ def parse_audit_logs_file(file_path, controller, service):
     # Find the timestamp of the first scale-up event across ALL services
     first_scale_up_timestamp = None
 
-    for entry in audit_data:
-        log = entry.get('log', {})
-        
-        if is_scale_up_event(log):
-            first_scale_up_timestamp = int(entry.get('timestamp', '0'))
+    for first_scale_up_index, (timestamp, log) in enumerate(audit_data):
+        if audit_event_type(log, SCALE_UP_REPLICAS) == SCALE_UP_EVENT:
+            first_scale_up_timestamp = timestamp
             print(f"  First scale-up found at timestamp {first_scale_up_timestamp}")
             break
     
@@ -53,16 +66,20 @@ def parse_audit_logs_file(file_path, controller, service):
         print(f"  Warning: No scale-up events found in logs")
         return {}
 
-    # Filter audit_data to only include logs after the first scale-up
-    audit_data = [entry for entry in audit_data if int(entry.get('timestamp', '0')) >= first_scale_up_timestamp]
+    # Filter audit_data to only include logs after the first scale-up: the entries are sorted,
+    # so they start at the first scale-up index or just before it if timestamps are equal
+    start = first_scale_up_index
+    while start > 0 and audit_data[start - 1][0] == first_scale_up_timestamp:
+        start -= 1
+    audit_data = audit_data[start:]
     print(f"  After filtering: {len(audit_data)} audit log entries remain")
 
     # Process each log entry
-    for entry in audit_data:
-        log = entry.get('log', {})
-        
+    for timestamp, log in audit_data:
+        event_type = audit_event_type(log, SCALE_UP_REPLICAS)
+
         # Check if this is a scale-up event
-        if is_scale_up_event(log):
+        if event_type == SCALE_UP_EVENT:
             object_ref = log.get('objectRef', {})
             resource_name = object_ref.get('name', '')
 
@@ -71,14 +88,14 @@ def parse_audit_logs_file(file_path, controller, service):
 
             if 'scale_up_timestamp' in service_metrics:
                 raise ValueError(f"Duplicate scale-up event for {service_name}")
-            service_metrics['scale_up_timestamp'] = int(entry.get('timestamp', '0'))
+            service_metrics['scale_up_timestamp'] = timestamp
 
             print(f"  Scale-up event for {service_name} at timestamp {service_metrics['scale_up_timestamp']}")
             
             continue
 
         # Check if this is a starts_processing event
-        if controller == "preempt-k8s" and is_starts_processing_event(log):
+        if controller == "preempt-k8s" and event_type == STARTS_PROCESSING_EVENT:
             object_ref = log.get('objectRef', {})
             resource_name = object_ref.get('name', '')
             
@@ -87,14 +104,14 @@ def parse_audit_logs_file(file_path, controller, service):
             
             if 'starts_processing_timestamp' in service_metrics:
                 raise ValueError(f"Duplicate starts_processing event for {service_name}")
-            service_metrics['starts_processing_timestamp'] = int(entry.get('timestamp', '0'))
+            service_metrics['starts_processing_timestamp'] = timestamp
 
             print(f"  Starts processing event for {service_name} at timestamp {service_metrics['starts_processing_timestamp']}")
 
             continue
 
         # Check if this is a pod creation event
-        if is_pod_created_event(log):
+        if event_type == POD_CREATED_EVENT:
             request_object = log.get('requestObject', {})
             metadata = request_object.get('metadata', {})
             labels = metadata.get('labels', {})
@@ -110,18 +127,18 @@ def parse_audit_logs_file(file_path, controller, service):
             if controller == "kube-manager":
                 if 'starts_processing_timestamp' in service_metrics:
                     raise ValueError(f"Duplicate starts_processing event for {service_name}")
-                service_metrics['starts_processing_timestamp'] = int(entry.get('timestamp', '0'))
+                service_metrics['starts_processing_timestamp'] = timestamp
             
             if 'pod_created_timestamp' in service_metrics:
                     raise ValueError(f"Duplicate pod_created event for {service_name}")
-            service_metrics['pod_created_timestamp'] = int(entry.get('timestamp', '0'))
+            service_metrics['pod_created_timestamp'] = timestamp
 
             print(f"  Pod created event for {service_name} at timestamp {service_metrics['pod_created_timestamp']}")
             
             continue
         
         # Check if this is a pod started event
-        if is_pod_started_event(log):
+        if event_type == POD_STARTED_EVENT:
             # Extract deployment_name from responseObject metadata labels
             response_object = log.get('responseObject', {})
             metadata = response_object.get('metadata', {})
@@ -137,7 +154,7 @@ def parse_audit_logs_file(file_path, controller, service):
             
             if 'pod_started_timestamp' in service_metrics:
                 raise ValueError(f"Duplicate pod_started event for {service_name}")
-            service_metrics['pod_started_timestamp'] = int(entry.get('timestamp', '0'))
+            service_metrics['pod_started_timestamp'] = timestamp
 
             print(f"  Pod started event for {service_name} at timestamp {service_metrics['pod_started_timestamp']}")
             
@@ -194,8 +211,6 @@ def create_scatter_plot(all_experiment_events, output_path, mode, service_name,
     fig.patch.set_facecolor('#FFFFFF')
     ax.set_facecolor('#FFFFFF')
     
-    import numpy as np
-    
     # Store points by event type and experiment for connecting lines
     points_by_type_and_exp = {
         'scale-up': [],
@@ -204,7 +219,15 @@ def create_scatter_plot(all_experiment_events, output_path, mode, service_name,
         'pod_started': []
     }
     
-    # Plot events for each experiment
+    # Store all the points of each event type, to draw them with one scatter call per type
+    x_by_type = {event_type: [] for event_type in points_by_type_and_exp}
+    y_by_type = {event_type: [] for event_type in points_by_type_and_exp}
+    
+    # Add very small vertical spread to separate exact overlaps, drawn at once for all the events
+    y_jitter = np.random.uniform(-0.01, 0.01, sum(len(events) for _, events in all_experiment_events))
+    jitter_idx = 0
+    
+    # Collect events for each experiment
     for exp_idx, events in all_experiment_events:
         # Place experiments in a single column (one row per experiment).
         # Use reversed order so iteration 0 appears at the top.
@@ -219,7 +242,7 @@ def create_scatter_plot(all_experiment_events, output_path, mode, service_name,
                 events_by_type[event_type] = []
             events_by_type[event_type].append(event['timestamp'])
         
-        # Plot each event type and store points per experiment
+        # Collect each event type and store points per experiment
         exp_points_by_type = {
             'scale-up': [],
             'starts_processing': [],
@@ -228,36 +251,44 @@ def create_scatter_plot(all_experiment_events, output_path, mode, service_name,
         }
         
         for event_type, timestamps in events_by_type.items():
-            # Add very small vertical spread to separate exact overlaps
-            y_jitter = np.random.uniform(-0.01, 0.01, len(timestamps))
-            y_values = [y_base + j for j in y_jitter]
+            y_values = y_base + y_jitter[jitter_idx:jitter_idx + len(timestamps)]
+            jitter_idx += len(timestamps)
             
             # Store points for this experiment
-            for t, y in zip(timestamps, y_values):
-                exp_points_by_type[event_type].append((t, y))
+            exp_points_by_type[event_type].extend(zip(timestamps, y_values.tolist()))
             
-            ax.scatter(
-                timestamps, 
-                y_values, 
-                c=colors[event_type], 
-                marker=markers[event_type],
-                s=500,
-                alpha=0.9,
-                edgecolors='black',
-                linewidth=0.7,
-                zorder=3
-            )
+            x_by_type[event_type].extend(timestamps)
+            y_by_type[event_type].extend(y_values)
         
         # Store experiment points grouped by type
         for event_type in points_by_type_and_exp.keys():
             if exp_points_by_type[event_type]:
                 points_by_type_and_exp[event_type].append(exp_points_by_type[event_type])
     
-    # Draw connecting lines for each event type
+    # Plot the events of each type
+    for event_type, timestamps in x_by_type.items():
+        if not timestamps:
+            continue
+        
+        ax.scatter(
+            timestamps, 
+            y_by_type[event_type], 
+            c=colors[event_type], 
+            marker=markers[event_type],
+            s=500,
+            alpha=0.9,
+            edgecolors='black',
+            linewidth=0.7,
+            zorder=3
+        )
+    
+    # Draw connecting lines for each event type, as a single collection of segments
     for event_type, experiments_points in points_by_type_and_exp.items():
         if not experiments_points:
             continue
         
+        segments = []
+        linewidths = []
         prev_last_point = None
         
         for exp_points in experiments_points:
@@ -267,37 +298,28 @@ def create_scatter_plot(all_experiment_events, output_path, mode, service_name,
             # Sort points within this experiment by timestamp
             exp_points_sorted = sorted(exp_points, key=lambda p: p[0])
             
-            # If there's a previous experiment, connect to it with dashed line
+            # If there's a previous experiment, connect to it with a thick segment
             if prev_last_point is not None:
-                first_point = exp_points_sorted[0]
                 # Vertical line from last point of previous exp to first point of current exp
-                ax.plot(
-                    [prev_last_point[0], first_point[0]],
-                    [prev_last_point[1], first_point[1]],
-                    color=colors[event_type],
-                    alpha=0.3,
-                    linewidth=5,
-                    linestyle='--',
-                    zorder=2
-                )
+                segments.append((prev_last_point, exp_points_sorted[0]))
+                linewidths.append(5)
             
             # Connect points within this experiment
-            for i in range(len(exp_points_sorted) - 1):
-                x1, y1 = exp_points_sorted[i]
-                x2, y2 = exp_points_sorted[i + 1]
-                
-                ax.plot(
-                    [x1, x2],
-                    [y1, y2],
-                    color=colors[event_type],
-                    alpha=0.3,
-                    linewidth=1.5,
-                    linestyle='--',
-                    zorder=2
-                )
+            segments.extend(zip(exp_points_sorted[:-1], exp_points_sorted[1:]))
+            linewidths.extend([1.5] * (len(exp_points_sorted) - 1))
             
             # Store last point for connecting to next experiment
             prev_last_point = exp_points_sorted[-1]
+        
+        if segments:
+            ax.add_collection(LineCollection(
+                segments,
+                colors=colors[event_type],
+                alpha=0.3,
+                linewidths=linewidths,
+                linestyles='--',
+                zorder=2
+            ))
     
     # Set Y-axis ticks and labels: one tick per experiment
     y_ticks = [i for i in range(total_experiments)]
@@ -379,195 +401,24 @@ def create_scatter_plot(all_experiment_events, output_path, mode, service_name,
         spine.set_linewidth(1.2)
     
     # Adjust layout
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Save plot
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    
-    # Reset style to default for next plots
-    plt.style.use('default')
+    fig.savefig(output_path, dpi=PLOT_DPI, bbox_inches='tight', facecolor='white')
+    plt.close(fig)
     
     print(f"\nScatter plot saved to: {output_path}")
 
 
-def is_scale_up_event(log):
-    """
-    Check if a log entry represents a potential scale-up event.
-    """
-    if log.get('verb') != 'patch':
-        return False
-    
-    user = log.get('user', {})
-    if user.get('username') != 'system:serviceaccount:knative-serving:controller':
-        return False
-    
-    user_agent = log.get('userAgent', '')
-    if not user_agent.startswith('autoscaler/'):
-        return False
-    
-    object_ref = log.get('objectRef', {})
-    if object_ref.get('resource') != 'deployments' and object_ref.get('resource') != 'rtresources':
-        return False
-    if object_ref.get('namespace') != 'default':
-        return False
-    if object_ref.get('apiGroup') != 'apps' and object_ref.get('apiGroup') != 'rtgroup.critical.com':
-        return False
-    if object_ref.get('apiVersion') != 'v1':
-        return False
-
-    request_object = log.get('requestObject', [])
-    if not isinstance(request_object, list):
-        return False
-
-    has_replicas_patch = False
-    for patch_op in request_object:
-        if (patch_op.get('op') == 'replace' and 
-            patch_op.get('path') == '/spec/replicas' and 
-            patch_op.get('value') == 1):
-            has_replicas_patch = True
-            break
-    
-    if not has_replicas_patch:
-        return False
-    
-    response_status = log.get('responseStatus', {})
-    if response_status.get('code') != 200:
-        return False
-    
-    return True
-
-
-def is_starts_processing_event(log):
-    """
-    Check if a log entry represents a starts_processing event.
-    NOTE: only used with RTResources.
-    """
-    if log.get('verb') != 'update':
-        return False
-    
-    user = log.get('user', {})
-    if user.get('username') != 'system:serviceaccount:realtime:preempt-k8s':
-        return False
-    
-    object_ref = log.get('objectRef', {})
-    if object_ref.get('resource') != 'rtresources':
-        return False
-    if object_ref.get('namespace') != 'default':
-        return False
-    if object_ref.get('apiGroup') != 'rtgroup.critical.com':
-        return False
-    if object_ref.get('apiVersion') != 'v1':
-        return False
-    if object_ref.get('subresource') != 'status':
-        return False
-    
-    response_status = log.get('responseStatus', {})
-    if response_status.get('code') != 200:
-        return False
-    
-    # Check responseObject conditions
-    response_object = log.get('responseObject', {})
-    status = response_object.get('status', {})
-    conditions = status.get('conditions', [])
-    
-    progressing_true = False
-    ready_false = False
-    progressing_transition_time = None
-    ready_transition_time = None
-    
-    for condition in conditions:
-        if condition.get('type') == 'Progressing' and condition.get('status') == 'True':
-            progressing_true = True
-            progressing_transition_time = condition.get('lastTransitionTime')
-        if condition.get('type') == 'Ready' and condition.get('status') == 'False':
-            ready_false = True
-            ready_transition_time = condition.get('lastTransitionTime')
-    
-    if not (progressing_true and ready_false):
-        return False
-    
-    if progressing_transition_time is None or ready_transition_time is None:
-        return False
-    
-    if progressing_transition_time != ready_transition_time:
-        return False
-    
-    return True
-
-
-def is_pod_created_event(log):
-    """
-    Check if a log entry represents a pod creation event.
-    NOTE: used also as starts_processing event for Deployments.
-    """
-    if log.get('verb') != 'create':
-        return False
-    
-    user = log.get('user', {})
-    if user.get('username') != 'system:serviceaccount:kube-system:replicaset-controller' and user.get('username') != 'system:serviceaccount:realtime:preempt-k8s':
-        return False
-    
-    object_ref = log.get('objectRef', {})
-    if object_ref.get('resource') != 'pods':
-        return False
-    if object_ref.get('namespace') != 'default':
-        return False
-    if object_ref.get('apiVersion') != 'v1':
-        return False
-    
-    response_status = log.get('responseStatus', {})
-    if response_status.get('code') != 201:
-        return False
-    
-    return True
-
-
-def is_pod_started_event(log):
+def _parse_audit_logs_task(file_path, controller, service):
     """
-    Check if a log entry represents a pod started event (kubelet patch).
+    Parse an audit logs file for a service in a worker process.
+    Returns the service metrics, or the exception raised while parsing.
     """
-    if log.get('verb') != 'patch':
-        return False
-    
-    user_agent = log.get('userAgent', '')
-    if not user_agent.startswith('kubelet/'):
-        return False
-    
-    object_ref = log.get('objectRef', {})
-    if object_ref.get('resource') != 'pods':
-        return False
-    if object_ref.get('namespace') != 'default':
-        return False
-    if object_ref.get('apiVersion') != 'v1':
-        return False
-    if object_ref.get('subresource') != 'status':
-        return False
-    
-    response_status = log.get('responseStatus', {})
-    if response_status.get('code') != 200:
-        return False
-    
-    response_object = log.get('responseObject', {})
-    status = response_object.get('status', {})
-    
-    if status.get('phase') != 'Running':
-        return False
-    
-    conditions = status.get('conditions', [])
-    required_conditions = ['PodReadyToStartContainers', 'Initialized', 'Ready', 'ContainersReady', 'PodScheduled']
-    
-    conditions_status = {}
-    for condition in conditions:
-        cond_type = condition.get('type')
-        if cond_type in required_conditions:
-            conditions_status[cond_type] = condition.get('status')
-    
-    for req_cond in required_conditions:
-        if conditions_status.get(req_cond) != 'True':
-            return False
-    
-    return True
+    try:
+        return parse_audit_logs_file(file_path, controller, service)
+    except Exception as e:
+        return e
 
 
 def generate_event_scatter_plot(experiment_path, output_path, audit_files, controller_name):
@@ -586,7 +437,7 @@ def generate_event_scatter_plot(experiment_path, output_path, audit_files, contr
     
     # Sort audit files by iteration number
     def extract_iteration_num(filename):
-        match = re.search(r'iteration_(\d+)', filename)
+        match = ITERATION_RE.search(filename)
         return int(match.group(1)) if match else 0
     
     audit_files_sorted = sorted(audit_files, key=extract_iteration_num)
@@ -594,14 +445,19 @@ def generate_event_scatter_plot(experiment_path, output_path, audit_files, contr
     # Collect events for each experiment
     all_experiment_events = []
     
-    for idx, audit_file in enumerate(audit_files_sorted):
-        file_path = os.path.join(experiment_path, audit_file)
+    # Audit logs files are independent, so parse them in parallel
+    file_paths = [os.path.join(experiment_path, audit_file) for audit_file in audit_files_sorted]
+    with ProcessPoolExecutor() as executor:
+        parsed_audit_files = list(executor.map(_parse_audit_logs_task, file_paths, repeat(controller_name), repeat(service_id)))
+    
+    for idx, (audit_file, metrics) in enumerate(zip(audit_files_sorted, parsed_audit_files)):
         iteration_num = extract_iteration_num(audit_file)
         print(f"\nProcessing iteration {iteration_num} ({audit_file})...")
         
         try:
-            # Parse audit logs to get timestamps for this service
-            metrics = parse_audit_logs_file(file_path, controller_name, service_id)
+            # Timestamps for this service, or the error raised while parsing them
+            if isinstance(metrics, Exception):
+                raise metrics
             
             if not metrics:
                 print(f"  Warning: No metrics found for {service_id} in iteration {iteration_num}")
@@ -3,8 +3,61 @@ import sys
 import csv
 import re
 import json
-import matplotlib.pyplot as plt
+import mmap
+import warnings
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# Resolution of the saved plots (set PLOT_DPI=300 for publication-quality figures)
+PLOT_DPI = int(os.environ.get('PLOT_DPI', 150))
+
+# Every audit event of interest is a patch, an update or a create issued either
+# by one of these users or by a client with one of these user agents
+AUDIT_EVENT_VERBS = {'patch', 'update', 'create'}
+AUDIT_EVENT_USERNAMES = {
+    'system:serviceaccount:realtime:preempt-k8s',
+    'system:serviceaccount:kube-system:replicaset-controller'
+}
+AUDIT_EVENT_USER_AGENTS = ('autoscaler/', 'kubelet/')
+
+# Scaled resources (Deployments or RTResources) and the users creating their pods
+SCALE_UP_RESOURCES = frozenset({'deployments', 'rtresources'})
+SCALE_UP_API_GROUPS = frozenset({'apps', 'rtgroup.critical.com'})
+POD_CREATOR_USERNAMES = frozenset({
+    'system:serviceaccount:kube-system:replicaset-controller',
+    'system:serviceaccount:realtime:preempt-k8s'
+})
+
+# Pod conditions that must all be True when a pod has started
+POD_STARTED_CONDITIONS = ('PodReadyToStartContainers', 'Initialized', 'Ready', 'ContainersReady', 'PodScheduled')
+
+# Replicas set by the autoscaler patch of a scale-up
+SCALE_UP_REPLICAS = 2
+
+# Fields of a status file, in the order they are written by experiment.sh
+STATUS_RE = re.compile(
+    rb'Issued:\s*(?P<issued>\d+).*?'
+    rb'Completed:\s*(?P<completed>\d+).*?'
+    rb'Target RPS:\s*(?P<target_rps>[\d.]+).*?'
+    rb'Real RPS:\s*(?P<real_rps>[\d.]+)',
+    re.DOTALL
+)
+# Status files are a few hundred bytes; only this much is read, so a stray large file cannot be loaded whole
+STATUS_MAX_BYTES = 4096
 
 
 def parse_status_file(file_path):
@@ -14,22 +67,18 @@ def parse_status_file(file_path):
     """
     data = {}
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
+        with open(file_path, 'rb') as f:
+            content = f.read(STATUS_MAX_BYTES)
             
-        # Extract values using regex
-        issued_match = re.search(r'Issued:\s*(\d+)', content)
-        completed_match = re.search(r'Completed:\s*(\d+)', content)
-        target_rps_match = re.search(r'Target RPS:\s*([\d.]+)', content)
-        real_rps_match = re.search(r'Real RPS:\s*([\d.]+)', content)
-        
-        if not all([issued_match, completed_match, target_rps_match, real_rps_match]):
+        # Extract all values with a single regex pass
+        match = STATUS_RE.search(content)
+        if match is None:
             raise ValueError(f"Missing fields in {file_path}")
         
-        data['issued'] = int(issued_match.group(1))
-        data['completed'] = int(completed_match.group(1))
-        data['target_rps'] = float(target_rps_match.group(1))
-        data['real_rps'] = float(real_rps_match.group(1))
+        data['issued'] = int(match.group('issued'))
+        data['completed'] = int(match.group('completed'))
+        data['target_rps'] = float(match.group('target_rps'))
+        data['real_rps'] = float(match.group('real_rps'))
         
         # Validate that values are not zero or empty
         if data['issued'] == 0:
@@ -49,22 +98,15 @@ def parse_status_file(file_path):
 def parse_rps_file(file_path):
     """
     Parse an RPS file containing latency values (one per line).
-    Returns a list of integer latency values.
+    Returns a NumPy array of integer latency values.
     """
     try:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
-        
-        latencies = []
-        for line in lines:
-            line = line.strip()
-            if line:
-                try:
-                    latencies.append(int(line))
-                except ValueError:
-                    raise ValueError(f"Invalid latency value '{line}' in {file_path}")
+        with warnings.catch_warnings():
+            # An empty file is reported below, not as a loadtxt warning
+            warnings.simplefilter('ignore', UserWarning)
+            latencies = np.loadtxt(file_path, dtype=np.int64, ndmin=1)
         
-        if not latencies:
+        if latencies.size == 0:
             raise ValueError(f"No latency values found in {file_path}")
         
         return latencies
@@ -72,9 +114,10 @@ def parse_rps_file(file_path):
         raise ValueError(f"Error parsing {file_path}: {str(e)}")
 
 
-def is_scale_up_event(log):
+def is_scale_up_event(log, replicas=SCALE_UP_REPLICAS):
     """
-    Check if a log entry represents a potential scale-up event.
+    Check if a log entry represents a potential scale-up event,
+    i.e. a patch setting the replicas to the given value.
     """
     # Check verb
     if log.get('verb') != 'patch':
@@ -92,11 +135,11 @@ def is_scale_up_event(log):
     
     # Check objectRef
     object_ref = log.get('objectRef', {})
-    if object_ref.get('resource') != 'deployments' and object_ref.get('resource') != 'rtresources':
+    if object_ref.get('resource') not in SCALE_UP_RESOURCES:
         return False
     if object_ref.get('namespace') != 'default':
         return False
-    if object_ref.get('apiGroup') != 'apps' and object_ref.get('apiGroup') != 'rtgroup.critical.com':
+    if object_ref.get('apiGroup') not in SCALE_UP_API_GROUPS:
         return False
     if object_ref.get('apiVersion') != 'v1':
         return False
@@ -106,12 +149,12 @@ def is_scale_up_event(log):
     if not isinstance(request_object, list):
         return False
     
-    # Check if there's a patch operation that sets replicas to 2
+    # Check if there's a patch operation that sets the replicas
     has_replicas_patch = False
     for patch_op in request_object:
         if (patch_op.get('op') == 'replace' and 
             patch_op.get('path') == '/spec/replicas' and 
-            patch_op.get('value') == 2):
+            patch_op.get('value') == replicas):
             has_replicas_patch = True
             break
     
@@ -200,7 +243,7 @@ def is_pod_created_event(log):
     
     # Check user
     user = log.get('user', {})
-    if user.get('username') != 'system:serviceaccount:kube-system:replicaset-controller' and user.get('username') != 'system:serviceaccount:realtime:preempt-k8s':
+    if user.get('username') not in POD_CREATOR_USERNAMES:
         return False
     
     # Check objectRef
@@ -256,21 +299,85 @@ def is_pod_started_event(log):
     if status.get('phase') != 'Running':
         return False
     
+    # Last status reported for each condition type, in a single pass
     conditions = status.get('conditions', [])
-    required_conditions = ['PodReadyToStartContainers', 'Initialized', 'Ready', 'ContainersReady', 'PodScheduled']
-    
-    conditions_status = {}
-    for condition in conditions:
-        cond_type = condition.get('type')
-        if cond_type in required_conditions:
-            conditions_status[cond_type] = condition.get('status')
+    conditions_status = {condition.get('type'): condition.get('status') for condition in conditions}
     
     # Verify all required conditions are True
-    for req_cond in required_conditions:
-        if conditions_status.get(req_cond) != 'True':
-            return False
+    return all(conditions_status.get(cond_type) == 'True' for cond_type in POD_STARTED_CONDITIONS)
+
+
+# Audit event types, in the order they happen for a service
+SCALE_UP_EVENT = 'scale_up'
+STARTS_PROCESSING_EVENT = 'starts_processing'
+POD_CREATED_EVENT = 'pod_created'
+POD_STARTED_EVENT = 'pod_started'
+
+# Predicate of the audit event each (verb, resource) pair can be
+AUDIT_EVENT_DISPATCH = {
+    ('patch', 'deployments'): (SCALE_UP_EVENT, is_scale_up_event),
+    ('patch', 'rtresources'): (SCALE_UP_EVENT, is_scale_up_event),
+    ('update', 'rtresources'): (STARTS_PROCESSING_EVENT, is_starts_processing_event),
+    ('create', 'pods'): (POD_CREATED_EVENT, is_pod_created_event),
+    ('patch', 'pods'): (POD_STARTED_EVENT, is_pod_started_event)
+}
+
+
+def audit_event_type(log, scale_up_replicas=SCALE_UP_REPLICAS):
+    """
+    Classify a log entry as one of the audit events.
+    The (verb, resource) pair selects the only predicate that can match the entry,
+    scale-up events are the patches setting the replicas to scale_up_replicas.
+    Returns the event type, or None if the entry is not an audit event.
+    """
+    event = AUDIT_EVENT_DISPATCH.get((log.get('verb'), log.get('objectRef', {}).get('resource')))
+    if event is None:
+        return None
+    event_type, is_event = event
+    if event_type == SCALE_UP_EVENT:
+        matches = is_event(log, scale_up_replicas)
+    else:
+        matches = is_event(log)
+    return event_type if matches else None
+
+
+def is_audit_event_candidate(log):
+    """
+    Cheap check on the verb, user and user agent of a log entry.
+    Returns False if the entry cannot be any of the audit events above.
+    """
+    if log.get('verb') not in AUDIT_EVENT_VERBS:
+        return False
+    if log.get('user', {}).get('username') in AUDIT_EVENT_USERNAMES:
+        return True
+    return log.get('userAgent', '').startswith(AUDIT_EVENT_USER_AGENTS)
+
+
+def load_audit_entries(file_path):
+    """
+    Load a json audit logs file as a list of (timestamp, log) tuples sorted by timestamp.
+    Entries that cannot match any audit event are dropped while loading.
+    The file is decoded with orjson when it is installed, otherwise it is
+    streamed with ijson, falling back to the standard json module.
+    """
+    with open(file_path, 'rb') as f:
+        if orjson is not None:
+            # Parse straight off the mapped pages, without reading the file into a copy first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+                audit_data = orjson.loads(buf)
+        elif ijson is not None:
+            audit_data = ijson.items(f, 'item', use_float=True)
+        else:
+            audit_data = json.load(f)
+        
+        entries = []
+        for entry in audit_data:
+            log = entry.get('log', {})
+            if is_audit_event_candidate(log):
+                entries.append((int(entry.get('timestamp', '0')), log))
     
-    return True
+    entries.sort(key=itemgetter(0))
+    return entries
 
 
 def parse_audit_logs_file(file_path, controller, service):
@@ -282,124 +389,144 @@ def parse_audit_logs_file(file_path, controller, service):
         - pod_created_timestamp;
         - pod_started_timestamp.
     """
+    service_metrics = parse_audit_logs_file_all(file_path, controller, [service])[service]
+    if isinstance(service_metrics, ValueError):
+        raise service_metrics
+    return service_metrics
+
+
+def parse_audit_logs_file_all(file_path, controller, services):
+    """
+    Parse a json audit logs file once and extract control plane metrics for all the given services.
+    Returns a dict where the keys are the services and the values are either the
+    service metrics (see parse_audit_logs_file) or the ValueError raised for that service.
+    """
     if controller not in ["preempt-k8s", "kube-manager"]:
         raise ValueError(f"Unsupported controller: {controller}")
     
-    if controller == "preempt-k8s":
-        service_name = f"{service}-00001-rtresource"
-    elif controller == "kube-manager":
-        service_name = f"{service}-00001-deployment"
-
-    # Load audit logs
-    with open(file_path, 'r') as f:
-        audit_data = json.load(f)
-    
-    # Sort logs by timestamp
-    audit_data.sort(key=lambda x: int(x.get('timestamp', '0')))
-
-    # Initialize metrics dictionary
-    service_metrics = {}
+    # Map the resource names and the pod label values back to the services
+    service_names = {}
+    pod_label_names = {}
+    for service in services:
+        if controller == "preempt-k8s":
+            service_name = f"{service}-00001-rtresource"
+            pod_label_names[service_name] = service_name
+        elif controller == "kube-manager":
+            service_name = f"{service}-00001-deployment"
+            pod_label_names[f"{service}-00001"] = service_name
+        service_names[service_name] = service
+    pod_label = 'rtresource_name' if controller == "preempt-k8s" else 'app'
+
+    # Load audit logs sorted by timestamp
+    audit_data = load_audit_entries(file_path)
+
+    # Initialize metrics and errors dictionaries
+    all_metrics = {service_name: {} for service_name in service_names}
+    errors = {}
 
     # Find the timestamp of the first scale-up event across ALL services
     first_scale_up_timestamp = None
 
-    for entry in audit_data:
-        log = entry.get('log', {})
-        
-        if is_scale_up_event(log):
-            first_scale_up_timestamp = int(entry.get('timestamp', '0'))
+    for first_scale_up_index, (timestamp, log) in enumerate(audit_data):
+        if audit_event_type(log) == SCALE_UP_EVENT:
+            first_scale_up_timestamp = timestamp
             print(f"  First scale-up found at timestamp {first_scale_up_timestamp}")
             break
     
     if first_scale_up_timestamp is None:
         print(f"  Warning: No scale-up events found in logs")
-        return {}
-
-    # Filter audit_data to only include logs after the first scale-up
-    audit_data = [entry for entry in audit_data if int(entry.get('timestamp', '0')) >= first_scale_up_timestamp]
+        return {service: {} for service in services}
+
+    # Filter audit_data to only include logs after the first scale-up: the entries are sorted,
+    # so they start at the first scale-up index or just before it if timestamps are equal
+    start = first_scale_up_index
+    while start > 0 and audit_data[start - 1][0] == first_scale_up_timestamp:
+        start -= 1
+    audit_data = audit_data[start:]
     print(f"  After filtering: {len(audit_data)} audit log entries remain")
 
     # Process each log entry
-    for entry in audit_data:
-        log = entry.get('log', {})
+    for timestamp, log in audit_data:
+        event_type = audit_event_type(log)
         
         # Check if this is a scale-up event
-        if is_scale_up_event(log):
+        if event_type == SCALE_UP_EVENT:
             object_ref = log.get('objectRef', {})
-            resource_name = object_ref.get('name', '')
+            service_name = object_ref.get('name', '')
 
-            if resource_name != service_name:
+            if service_name not in all_metrics or service_name in errors:
                 continue
+            service_metrics = all_metrics[service_name]
 
             if 'scale_up_timestamp' in service_metrics:
-                raise ValueError(f"Duplicate scale-up event for {service_name} in audit logs file {file_path}")
-            service_metrics['scale_up_timestamp'] = int(entry.get('timestamp', '0'))
+                errors[service_name] = ValueError(f"Duplicate scale-up event for {service_name} in audit logs file {file_path}")
+                continue
+            service_metrics['scale_up_timestamp'] = timestamp
 
             print(f"  Scale-up event for {service_name} at timestamp {service_metrics['scale_up_timestamp']}")
             
             continue
 
         # Check if this is a starts_processing event
-        if controller == "preempt-k8s" and is_starts_processing_event(log):
+        if controller == "preempt-k8s" and event_type == STARTS_PROCESSING_EVENT:
             object_ref = log.get('objectRef', {})
-            resource_name = object_ref.get('name', '')
+            service_name = object_ref.get('name', '')
             
-            if resource_name != service_name:
+            if service_name not in all_metrics or service_name in errors:
                 continue
+            service_metrics = all_metrics[service_name]
             
             if 'starts_processing_timestamp' in service_metrics:
-                raise ValueError(f"Duplicate starts_processing event for {service_name} in audit logs file {file_path}")
-            service_metrics['starts_processing_timestamp'] = int(entry.get('timestamp', '0'))
+                errors[service_name] = ValueError(f"Duplicate starts_processing event for {service_name} in audit logs file {file_path}")
+                continue
+            service_metrics['starts_processing_timestamp'] = timestamp
 
             print(f"  Starts processing event for {service_name} at timestamp {service_metrics['starts_processing_timestamp']}")
 
             continue
 
         # Check if this is a pod creation event
-        if is_pod_created_event(log):
+        if event_type == POD_CREATED_EVENT:
             request_object = log.get('requestObject', {})
             metadata = request_object.get('metadata', {})
             labels = metadata.get('labels', {})
-            resource_name = ""
-            if controller == "preempt-k8s":
-                resource_name = labels.get('rtresource_name', '')
-            elif controller == "kube-manager":
-                resource_name = labels.get('app', '') + '-deployment'
+            service_name = pod_label_names.get(labels.get(pod_label))
             
-            if resource_name != service_name:
+            if service_name is None or service_name in errors:
                 continue
+            service_metrics = all_metrics[service_name]
             
             if controller == "kube-manager":
                 if 'starts_processing_timestamp' in service_metrics:
-                    raise ValueError(f"Duplicate starts_processing event for {service_name} in audit logs file {file_path}")
-                service_metrics['starts_processing_timestamp'] = int(entry.get('timestamp', '0'))
+                    errors[service_name] = ValueError(f"Duplicate starts_processing event for {service_name} in audit logs file {file_path}")
+                    continue
+                service_metrics['starts_processing_timestamp'] = timestamp
             
             if 'pod_created_timestamp' in service_metrics:
-                    raise ValueError(f"Duplicate pod_created event for {service_name} in audit logs file {file_path}")
-            service_metrics['pod_created_timestamp'] = int(entry.get('timestamp', '0'))
+                errors[service_name] = ValueError(f"Duplicate pod_created event for {service_name} in audit logs file {file_path}")
+                continue
+            service_metrics['pod_created_timestamp'] = timestamp
 
             print(f"  Pod created event for {service_name} at timestamp {service_metrics['pod_created_timestamp']}")
             
             continue
         
         # Check if this is a pod started event
-        if is_pod_started_event(log):
+        if event_type == POD_STARTED_EVENT:
             # Extract deployment_name from responseObject metadata labels
             response_object = log.get('responseObject', {})
             metadata = response_object.get('metadata', {})
             labels = metadata.get('labels', {})
-            resource_name = ""
-            if controller == "preempt-k8s":
-                resource_name = labels.get('rtresource_name', '')
-            elif controller == "kube-manager":
-                resource_name = labels.get('app', '') + '-deployment'
+            service_name = pod_label_names.get(labels.get(pod_label))
             
-            if resource_name != service_name:
+            if service_name is None or service_name in errors:
                 continue
+            service_metrics = all_metrics[service_name]
             
             if 'pod_started_timestamp' in service_metrics:
-                raise ValueError(f"Duplicate pod_started event for {service_name} in audit logs file {file_path}")
-            service_metrics['pod_started_timestamp'] = int(entry.get('timestamp', '0'))
+                errors[service_name] = ValueError(f"Duplicate pod_started event for {service_name} in audit logs file {file_path}")
+                continue
+            service_metrics['pod_started_timestamp'] = timestamp
 
             print(f"  Pod started event for {service_name} at timestamp {service_metrics['pod_started_timestamp']}")
             
@@ -412,15 +539,50 @@ def parse_audit_logs_file(file_path, controller, service):
         'pod_created_timestamp', 
         'pod_started_timestamp'
     ]
-    for key in required_keys:
-        if key not in service_metrics or service_metrics[key] <= 0:
-            raise ValueError(f"Missing or invalid event {key} for service {service_name} in audit logs file {file_path}")
-    
-    return service_metrics
+    results = {}
+    for service_name, service in service_names.items():
+        if service_name in errors:
+            results[service] = errors[service_name]
+            continue
+        service_metrics = all_metrics[service_name]
+        for key in required_keys:
+            if key not in service_metrics or service_metrics[key] <= 0:
+                results[service] = ValueError(f"Missing or invalid event {key} for service {service_name} in audit logs file {file_path}")
+                break
+        else:
+            results[service] = service_metrics
+    
+    return results
                     
 
-def save_boxplot(data, labels, title, ylabel, filename, directory):
-    fig, ax = plt.subplots(figsize=(6, 6))
+@lru_cache(maxsize=None)
+def _cdf_ranks(n):
+    """
+    Compute the cumulative probabilities of a sorted series of n values.
+    The array is shared between callers, so it is made read-only.
+    """
+    ranks = np.linspace(1.0 / max(n, 1), 1.0, n)
+    ranks.flags.writeable = False
+    return ranks
+
+
+def _ecdf(data):
+    """
+    Compute the empirical CDF of a series.
+    Returns the sorted values and their cumulative probabilities.
+    """
+    sorted_data = np.sort(np.asarray(data))
+    return sorted_data, _cdf_ranks(len(sorted_data))
+
+
+def save_boxplot(ax, data, labels, title, ylabel, filename, directory):
+    """
+    Draw a box plot on the given axes and save its figure.
+    The axes are cleared first, so the same figure can serve several plots.
+    """
+    import matplotlib.pyplot as plt
+    
+    ax.clear()
     bp = ax.boxplot(data, labels=labels, patch_artist=True)
     
     num_boxes = len(labels)
@@ -438,35 +600,40 @@ def save_boxplot(data, labels, title, ylabel, filename, directory):
     ax.set_ylabel(ylabel, fontsize=12)
     ax.set_title(title, fontsize=14, fontweight='bold')
     
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.figure.tight_layout()
     
+    # Everything is inside the axes, tight_layout is enough and avoids the extra render of bbox_inches='tight'
     plot_path = os.path.join(directory, filename)
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.figure.savefig(plot_path, dpi=PLOT_DPI)
     print(f"{title} saved to: {plot_path}")
 
 
-def save_cdf_plot(all_data, labels, title, xlabel, filename, directory):
-    fig, ax = plt.subplots(figsize=(8, 6))
+def save_cdf_plot(ax, all_data, labels, title, xlabel, filename, directory):
+    """
+    Draw the CDF of each series on the given axes and save its figure.
+    The axes are cleared first, so the same figure can serve several plots.
+    """
+    import matplotlib.pyplot as plt
+    
+    ax.clear()
     cmap = plt.get_cmap('tab10')
     
     for i, service_data in enumerate(all_data):
         # Calcolo della CDF
-        sorted_data = np.sort(service_data)
+        sorted_data, cdf = _ecdf(service_data)
         # Protezione per array vuoti
         if len(sorted_data) == 0: continue 
         
-        cdf = np.arange(1, len(sorted_data) + 1) / len(sorted_data)
-        
-        # Plot con colore automatico
+        # Plot con colore automatico (al massimo ~50 marker per serie)
         ax.plot(sorted_data, cdf, 
                 label=labels[i], 
                 color=cmap(i % 10), 
                 marker='o', 
                 linestyle='-', 
                 linewidth=2, 
-                markersize=4)
+                markersize=4,
+                markevery=max(1, len(sorted_data) // 50))
     
     ax.grid(True, linestyle='--', alpha=0.7)
     ax.set_xlabel(xlabel, fontsize=12)
@@ -474,10 +641,9 @@ def save_cdf_plot(all_data, labels, title, xlabel, filename, directory):
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.legend()
     
-    plt.tight_layout()
+    ax.figure.tight_layout()
     plot_path = os.path.join(directory, filename)
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.figure.savefig(plot_path, dpi=PLOT_DPI)
     print(f"{title} saved to: {plot_path}")
 
 
@@ -513,14 +679,15 @@ def main():
     status_files = {}
     rps_files = {}
     for i in range(num_services):
-        all_files = []
         service_name = f"service-{i+1}"
         service_path = os.path.join(root_path, f"service-{i+1}")
 
         if os.path.isdir(service_path):
-            all_files = os.listdir(service_path)
-            status_files[service_name] = [f for f in all_files if f.endswith("status.txt") and os.path.isfile(os.path.join(service_path, f))]
-            rps_files[service_name] = [f for f in all_files if f.startswith("rps") and os.path.isfile(os.path.join(service_path, f))]
+            # A single directory read, sorted by name once; the full paths are kept for parsing
+            with os.scandir(service_path) as it:
+                all_files = sorted((entry.name, entry.path) for entry in it if entry.is_file())
+            status_files[service_name] = [path for name, path in all_files if name.endswith("status.txt")]
+            rps_files[service_name] = [path for name, path in all_files if name.startswith("rps")]
     
             status_count = len(status_files[service_name])
             rps_count = len(rps_files[service_name])
@@ -535,9 +702,8 @@ def main():
                 print(f"Error: Expected exactly 10 rps files, but found {rps_count} for {service_name}!")
                 sys.exit(1)
     
-    all_audit_files = []
-    all_audit_files = os.listdir(root_path)
-    audit_files = [f for f in all_audit_files if f.startswith("loki-logs-iteration") and os.path.isfile(os.path.join(root_path, f))]
+    with os.scandir(root_path) as it:
+        audit_files = [entry.name for entry in it if entry.name.startswith("loki-logs-iteration") and entry.is_file()]
     audit_count = len(audit_files)
 
     print(f"Found {audit_count} audit logs files in total!")
@@ -548,13 +714,9 @@ def main():
     
     print("File count validation passed!")
     
-    # Create processed_results directory
-    processed_dir = os.path.join(root_path, "processed_results")
-    if not os.path.exists(processed_dir):
-        os.makedirs(processed_dir)
-        print(f"Created directory: {processed_dir}!")
-    else:
-        print(f"Directory already exists: {processed_dir}!")
+    # Create processed_results directory (its absence was checked above)
+    os.makedirs(processed_dir)
+    print(f"Created directory: {processed_dir}!")
     
     # Process audit logs files
     print("\nProcessing audit logs files for each service...")
@@ -571,134 +733,122 @@ def main():
     max_pod_startup_delay = {}
     all_pod_startup_delays = []
 
+    # Parse each audit logs file once for all services
+    service_ids = [f"rnn-serving-python-{i+1}" for i in range(num_services)]
+    audit_logs_files = []
+    for j in range(10):
+        audit_logs_file = os.path.join(root_path, f"loki-logs-iteration_{j+1}.json")
+        
+        if os.path.isfile(audit_logs_file):
+            audit_logs_files.append(audit_logs_file)
+        else:
+            print(f"Warning: Audit logs file not found: {audit_logs_file}")
+
+    # Files are independent, so they are parsed in parallel worker processes
+    print(f"\nProcessing {len(audit_logs_files)} audit logs files...")
+    try:
+        with ProcessPoolExecutor() as executor:
+            parsed_audit_files = list(executor.map(parse_audit_logs_file_all, audit_logs_files, repeat(controller_name), repeat(service_ids)))
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    # With Deployments, processing starts when the pod is created
+    if controller_name == "preempt-k8s":
+        starts_processing_key = 'starts_processing_timestamp'
+    else:
+        starts_processing_key = 'pod_created_timestamp'
+
     for i in range(num_services):
+        service_id = service_ids[i]
+        service_name = f"service-{i+1}"
 
-        starts_processing_delays = []
-        pod_creation_delays = []
-        pod_start_delays = []
+        # Timestamps of each iteration: scale-up, starts processing, pod created, pod started
+        timestamps = []
 
-        for j in range(10):
-            service_id = f"rnn-serving-python-{i+1}"
-            service_name = f"service-{i+1}"
-            audit_logs_file = os.path.join(root_path, f"loki-logs-iteration_{j+1}.json")
+        for parsed_audit_file in parsed_audit_files:
+            service_metrics = parsed_audit_file[service_id]
+            if isinstance(service_metrics, ValueError):
+                print(f"Error: {service_metrics}")
+                sys.exit(1)
             
-            if os.path.isfile(audit_logs_file):
-                print(f"\nProcessing audit logs for {service_id}...")
-                try:
-                    service_metrics = parse_audit_logs_file(audit_logs_file, controller_name, service_id)
-                    
-                    if service_metrics:
-                        # Calculate delays (converting nanoseconds to milliseconds)
-                        if controller_name == "preempt-k8s":
-                            starts_processing_delays.append( (service_metrics['starts_processing_timestamp'] - service_metrics['scale_up_timestamp']) / 1_000_000 )
-                        elif controller_name == "kube-manager":
-                            starts_processing_delays.append( (service_metrics['pod_created_timestamp'] - service_metrics['scale_up_timestamp']) / 1_000_000 )
-                        pod_creation_delays.append( (service_metrics['pod_created_timestamp'] - service_metrics['scale_up_timestamp']) / 1_000_000 )
-                        pod_start_delays.append( (service_metrics['pod_started_timestamp'] - service_metrics['scale_up_timestamp']) / 1_000_000 )
-                    else:
-                        print(f"No control plane metrics extracted for {service_id}.")
-                except ValueError as e:
-                    print(f"Error: {e}")
-                    sys.exit(1)
+            if service_metrics:
+                timestamps.append((
+                    service_metrics['scale_up_timestamp'],
+                    service_metrics[starts_processing_key],
+                    service_metrics['pod_created_timestamp'],
+                    service_metrics['pod_started_timestamp']
+                ))
             else:
-                print(f"Warning: Audit logs file not found: {audit_logs_file}")  
+                print(f"No control plane metrics extracted for {service_id}.")
+        
+        # Calculate all delays at once (converting nanoseconds to milliseconds)
+        timestamps = np.asarray(timestamps, dtype=np.int64).reshape(-1, 4)
+        delays = (timestamps[:, 1:] - timestamps[:, :1]) / 1_000_000
+        starts_processing_delays, pod_creation_delays, pod_start_delays = np.ascontiguousarray(delays.T)
         all_starts_processing_delays.append(starts_processing_delays)
         all_pod_creation_delays.append(pod_creation_delays)
         all_pod_startup_delays.append(pod_start_delays)
 
         # Calculate statistics for starts_processing delays
-        mean_starts_processing_delay[service_name] = sum(starts_processing_delays) / len(starts_processing_delays)
-        max_starts_processing_delay[service_name] = max(starts_processing_delays)
+        mean_starts_processing_delay[service_name] = starts_processing_delays.mean()
+        max_starts_processing_delay[service_name] = starts_processing_delays.max()
 
         # Calculate statistics for pod creation delays
-        mean_pod_creation_delay[service_name] = sum(pod_creation_delays) / len(pod_creation_delays)
-        max_pod_creation_delay[service_name] = max(pod_creation_delays)
+        mean_pod_creation_delay[service_name] = pod_creation_delays.mean()
+        max_pod_creation_delay[service_name] = pod_creation_delays.max()
 
         # Calculate statistics for pod start delays
-        mean_pod_startup_delay[service_name] = sum(pod_start_delays) / len(pod_start_delays)
-        max_pod_startup_delay[service_name] = max(pod_start_delays)
+        mean_pod_startup_delay[service_name] = pod_start_delays.mean()
+        max_pod_startup_delay[service_name] = pod_start_delays.max()
 
     # Process all status and rps files
     print("\nProcessing status and rps files for each service...")
 
-    mean_lost = {}
-    max_lost = {}
-    all_lost_requests = []
-    mean_completed = {}
-    max_completed = {}
-    all_completed_requests = []
-    real_rps = {}
-    max_real_rps = {}
-    all_real_rps = []
-
-    mean_of_mean_latencies = {}
-    all_mean_latencies = []
-    mean_of_max_latencies = {}
-    all_max_latencies = []
-
-    service_labels = []
-
-    for i in range(num_services):
-        service_name = f"service-{i+1}"
-        service_labels.append(service_name)
+    # The file count validation above guarantees exactly 10 status and 10 rps
+    # files for every service, so each metric is a (services x iterations) matrix
+    service_labels = [f"service-{i+1}" for i in range(num_services)]
+    all_lost_requests = np.empty((num_services, 10), dtype=np.int64)
+    all_completed_requests = np.empty((num_services, 10), dtype=np.int64)
+    all_real_rps = np.empty((num_services, 10), dtype=np.float64)
+    all_mean_latencies = np.empty((num_services, 10), dtype=np.float64)
+    all_max_latencies = np.empty((num_services, 10), dtype=np.float64)
 
+    for i, service_name in enumerate(service_labels):
         # Process all status files for the current service
         print(f"\nProcessing status files for {service_name}...")
 
-        lost_requests = []
-        completed_requests = []
-        real_rps_values = []
-        
-        for status_file in sorted(status_files[service_name]):
-            file_path = os.path.join(root_path, service_name, status_file)
+        for j, file_path in enumerate(status_files[service_name]):
             try:
                 data = parse_status_file(file_path)
-                lost = data['issued'] - data['completed']
-                lost_requests.append(lost)
-                completed_requests.append(data['completed'])
-                real_rps_values.append(data['real_rps'])
+                all_lost_requests[i, j] = data['issued'] - data['completed']
+                all_completed_requests[i, j] = data['completed']
+                all_real_rps[i, j] = data['real_rps']
             except ValueError as e:
                 print(f"Error: {e}")
                 sys.exit(1)
-        all_lost_requests.append(lost_requests)
-        all_completed_requests.append(completed_requests)
-        all_real_rps.append(real_rps_values)
-
-        # Calculate statistics for lost requests
-        mean_lost[service_name] = sum(lost_requests) / len(lost_requests)
-        max_lost[service_name] = max(lost_requests)
-
-        # Calculate statistics for completed requests
-        mean_completed[service_name] = sum(completed_requests) / len(completed_requests)
-        max_completed[service_name] = max(completed_requests)
-
-        # Calculate statistics for real RPS
-        real_rps[service_name] = sum(real_rps_values) / len(real_rps_values)
-        max_real_rps[service_name] = max(real_rps_values)
         
         # Process all rps files for the current service
         print(f"\nProcessing rps files for {service_name}...")
-    
-        mean_latencies = []
-        max_latencies = []
         
-        for rps_file in sorted(rps_files[service_name]):
-            file_path = os.path.join(root_path, service_name, rps_file)
+        for j, file_path in enumerate(rps_files[service_name]):
             try:
                 latencies = parse_rps_file(file_path)
-                mean_lat = sum(latencies) / len(latencies)
-                max_lat = max(latencies)
-                mean_latencies.append(mean_lat / 1000)  # Convert to milliseconds from microseconds
-                max_latencies.append(max_lat / 1000)  # Convert to milliseconds from microseconds
+                all_mean_latencies[i, j] = latencies.mean() / 1000  # Convert to milliseconds from microseconds
+                all_max_latencies[i, j] = latencies.max() / 1000  # Convert to milliseconds from microseconds
             except ValueError as e:
                 print(f"Error: {e}")
                 sys.exit(1)
-        all_mean_latencies.append(mean_latencies)
-        all_max_latencies.append(max_latencies)
-        
-        # Calculate statistics for latencies
-        mean_of_mean_latencies[service_name] = sum(mean_latencies) / len(mean_latencies)
-        mean_of_max_latencies[service_name] = sum(max_latencies) / len(max_latencies)
+    
+    # Calculate statistics for all services at once
+    mean_lost = dict(zip(service_labels, all_lost_requests.mean(axis=1)))
+    max_lost = dict(zip(service_labels, all_lost_requests.max(axis=1)))
+    mean_completed = dict(zip(service_labels, all_completed_requests.mean(axis=1)))
+    max_completed = dict(zip(service_labels, all_completed_requests.max(axis=1)))
+    real_rps = dict(zip(service_labels, all_real_rps.mean(axis=1)))
+    max_real_rps = dict(zip(service_labels, all_real_rps.max(axis=1)))
+    mean_of_mean_latencies = dict(zip(service_labels, all_mean_latencies.mean(axis=1)))
+    mean_of_max_latencies = dict(zip(service_labels, all_max_latencies.mean(axis=1)))
     
     # Write results to CSV
     csv_path = os.path.join(processed_dir, "metrics.csv")
@@ -713,9 +863,8 @@ def main():
                          'Pod Creation Delay Mean [ms]', 'Pod Creation Delay Max [ms]',
                          'Pod Startup Delay Mean [ms]', 'Pod Startup Delay Max [ms]'
                          ])
-        for i in range(num_services):
-            service_name = f"service-{i+1}"
-            writer.writerow([
+        rows = [
+            [
                 service_name,
                 f"{mean_of_mean_latencies[service_name]:.2f}", f"{mean_of_max_latencies[service_name]:.2f}",
                 f"{mean_lost[service_name]:.2f}", max_lost[service_name],
@@ -724,25 +873,37 @@ def main():
                 f"{mean_starts_processing_delay[service_name]:.2f}", f"{max_starts_processing_delay[service_name]:.2f}",
                 f"{mean_pod_creation_delay[service_name]:.2f}", f"{max_pod_creation_delay[service_name]:.2f}",
                 f"{mean_pod_startup_delay[service_name]:.2f}", f"{max_pod_startup_delay[service_name]:.2f}"
-            ])
+            ]
+            for service_name in service_labels
+        ]
+        writer.writerows(rows)
     print(f"\nResults saved to: {csv_path}")
     
     # Create box plots
     print("\nCreating box plots...")
 
+    # Matrices are passed as lists of rows, boxplot would draw one box per column of a 2D array
     box_plots_config = [
         (all_starts_processing_delays, "Starts Processing Delays Box Plot", "Delays [ms]", "boxplot_starts_processing_delays.png"),
         (all_pod_creation_delays, "Pod Creation Delays Box Plot", "Delays [ms]", "boxplot_pod_creation_delays.png"),
         (all_pod_startup_delays, "Pod Startup Delays Box Plot", "Delays [ms]", "boxplot_pod_startup_delays.png"),
-        (all_lost_requests, "Lost Requests Box Plot", "Number of Requests", "boxplot_lost_requests.png"),
-        (all_completed_requests, "Completed Requests Box Plot", "Number of Requests", "boxplot_completed_requests.png"),
-        (all_real_rps, "Real RPS Box Plot", "Real RPS", "boxplot_real_rps.png"),
-        (all_mean_latencies, "Mean Latencies Box Plot", "Latencies [ms]", "boxplot_mean_latencies.png"),
-        (all_max_latencies, "Max Latencies Box Plot", "Latencies [ms]", "boxplot_max_latencies.png")
+        (list(all_lost_requests), "Lost Requests Box Plot", "Number of Requests", "boxplot_lost_requests.png"),
+        (list(all_completed_requests), "Completed Requests Box Plot", "Number of Requests", "boxplot_completed_requests.png"),
+        (list(all_real_rps), "Real RPS Box Plot", "Real RPS", "boxplot_real_rps.png"),
+        (list(all_mean_latencies), "Mean Latencies Box Plot", "Latencies [ms]", "boxplot_mean_latencies.png"),
+        (list(all_max_latencies), "Max Latencies Box Plot", "Latencies [ms]", "boxplot_max_latencies.png")
     ]
 
+    # matplotlib is only needed from here on, with the non-interactive Agg backend
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # A single figure is reused for all box plots
+    box_fig, box_ax = plt.subplots(figsize=(6, 6))
     for data, title, ylabel, fname in box_plots_config:
-        save_boxplot(data, service_labels, title, ylabel, fname, processed_dir)
+        save_boxplot(box_ax, data, service_labels, title, ylabel, fname, processed_dir)
+    plt.close(box_fig)
     
     # Create CDF plots
     print("\nCreating CDF plots...")
@@ -755,8 +916,11 @@ def main():
         (all_max_latencies, "CDF of Max Latencies", "Max Latencies [ms]", "cdf_max_latencies.png")
     ]
 
+    # A single figure is reused for all CDF plots
+    cdf_fig, cdf_ax = plt.subplots(figsize=(8, 6))
     for data, title, xlabel, fname in cdf_plots_configs:
-        save_cdf_plot(data, service_labels, title, xlabel, fname, processed_dir)
+        save_cdf_plot(cdf_ax, data, service_labels, title, xlabel, fname, processed_dir)
+    plt.close(cdf_fig)
 
 
 if __name__ == "__main__":
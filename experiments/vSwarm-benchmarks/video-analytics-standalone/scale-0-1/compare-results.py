@@ -1,38 +1,69 @@
 import os
 import sys
 import csv
-import matplotlib.pyplot as plt
+import pickle
+import hashlib
+import inspect
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from results import (
     parse_status_file, 
     parse_rps_file, 
-    parse_audit_logs_file
+    parse_audit_logs_file_all
 )
 
 
-def save_comparative_boxplot(data_km, data_pk8s, labels, title, ylabel, filename, directory):
+# Resolution of the saved plots (set PLOT_DPI=300 for publication-quality figures)
+PLOT_DPI = int(os.environ.get('PLOT_DPI', 150))
+# Request counts stay integers, every other metric is a float64 array
+METRIC_DTYPES = {'lost_requests': np.int64, 'completed_requests': np.int64}
+# Parsed audit logs are cached in this directory only when COMPARE_CACHE is set, so re-runs skip parsing unchanged files
+CACHE_DIR = Path(os.environ['COMPARE_CACHE']) if os.environ.get('COMPARE_CACHE') else None
+# Version of the cached metrics format, part of every cache key along with a hash of the results.py parser
+CACHE_FORMAT = 1
+
+
+def _mm(values):
+    """
+    Compute mean and max of a metric array.
+    The mean is a float, the max keeps the dtype of the array (integer for request counts).
+    Returns zeros of the same types for an empty array.
+    """
+    arr = np.asarray(values)
+    if arr.size == 0:
+        return np.float64(0), arr.dtype.type(0)
+    return arr.mean(), arr.max()
+
+
+def _rps_stats(file_path):
+    """
+    Compute mean and max latency of an rps file, in milliseconds.
+    """
+    latencies = parse_rps_file(file_path)
+    # Convert to milliseconds from microseconds
+    return latencies.mean() / 1000, latencies.max() / 1000
+
+
+def save_comparative_boxplot(ax, data_km, data_pk8s, labels, title, ylabel, filename, directory):
     """
     Create a comparative boxplot with two boxes per service (kube-manager and preempt-k8s).
+    The given axes are cleared and reused, so the same figure can serve several plots.
     """
-    fig, ax = plt.subplots(figsize=(14, 6))
+    from matplotlib.patches import Patch
+    
+    ax.clear()
     
     # Prepare data for grouped boxplot
     num_services = len(labels)
-    positions_km = []
-    positions_pk8s = []
-    all_data = []
-    all_positions = []
+    all_data = [d for pair in zip(data_km, data_pk8s) for d in pair]
     
-    # Create positions for grouped boxes
+    # Create positions for grouped boxes (kube-manager and preempt-k8s interleaved)
     group_width = 2.5
-    for i in range(num_services):
-        pos_km = i * group_width
-        pos_pk8s = i * group_width + 0.8
-        positions_km.append(pos_km)
-        positions_pk8s.append(pos_pk8s)
-        all_data.extend([data_km[i], data_pk8s[i]])
-        all_positions.extend([pos_km, pos_pk8s])
+    base = np.arange(num_services) * group_width
+    all_positions = np.empty(2 * num_services)
+    all_positions[0::2] = base
+    all_positions[1::2] = base + 0.8
     
     # Create boxplot
     bp = ax.boxplot(all_data, positions=all_positions, widths=0.6, patch_artist=True)
@@ -53,7 +84,7 @@ def save_comparative_boxplot(data_km, data_pk8s, labels, title, ylabel, filename
         median.set(color='black', linewidth=2)
     
     # Set x-axis ticks and labels
-    ax.set_xticks([i * group_width + 0.4 for i in range(num_services)])
+    ax.set_xticks(base + 0.4)
     ax.set_xticklabels(labels, rotation=45, ha='right')
     
     ax.grid(True, axis='y', linestyle='--', alpha=0.7)
@@ -62,51 +93,55 @@ def save_comparative_boxplot(data_km, data_pk8s, labels, title, ylabel, filename
     ax.set_title(title, fontsize=14, fontweight='bold')
     
     # Add legend
-    from matplotlib.patches import Patch
     legend_elements = [
         Patch(facecolor=colors_km, edgecolor='black', label='kube-manager', alpha=0.7),
         Patch(facecolor=colors_pk8s, edgecolor='black', label='preempt-k8s', alpha=0.7)
     ]
     ax.legend(handles=legend_elements, loc='upper right')
     
-    plt.tight_layout()
+    ax.figure.tight_layout()
     plot_path = os.path.join(directory, filename)
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.figure.savefig(plot_path, dpi=PLOT_DPI, bbox_inches='tight')
     print(f"{title} saved to: {plot_path}")
 
 
-def save_comparative_cdf_plot(data_km, data_pk8s, labels, title, xlabel, filename, directory):
+def save_comparative_cdf_plot(ax, data_km, data_pk8s, labels, title, xlabel, filename, directory):
     """
     Create comparative CDF plots with two lines per service (kube-manager and preempt-k8s).
+    Each series in data_km and data_pk8s must already be sorted in ascending order.
+    The given axes are cleared and reused, so the same figure can serve several plots.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
+    import matplotlib.pyplot as plt
+    
+    ax.clear()
     cmap = plt.get_cmap('tab10')
     
     for i in range(len(labels)):
         # CDF for kube-manager
-        sorted_data_km = np.sort(data_km[i])
-        if len(sorted_data_km) > 0:
-            cdf_km = np.arange(1, len(sorted_data_km) + 1) / len(sorted_data_km)
+        sorted_data_km = data_km[i]
+        n_km = len(sorted_data_km)
+        if n_km > 0:
+            cdf_km = np.linspace(1.0 / n_km, 1.0, n_km)
             ax.plot(sorted_data_km, cdf_km, 
                     label=f'{labels[i]} (KM)', 
                     color=cmap(i % 10), 
                     linestyle='-', 
-                    linewidth=2, 
-                    marker='o',
-                    markersize=3)
+                    linewidth=2,
+                    drawstyle='steps-post',
+                    rasterized=True)
         
         # CDF for preempt-k8s
-        sorted_data_pk8s = np.sort(data_pk8s[i])
-        if len(sorted_data_pk8s) > 0:
-            cdf_pk8s = np.arange(1, len(sorted_data_pk8s) + 1) / len(sorted_data_pk8s)
+        sorted_data_pk8s = data_pk8s[i]
+        n_pk8s = len(sorted_data_pk8s)
+        if n_pk8s > 0:
+            cdf_pk8s = np.linspace(1.0 / n_pk8s, 1.0, n_pk8s)
             ax.plot(sorted_data_pk8s, cdf_pk8s, 
                     label=f'{labels[i]} (PK8s)', 
                     color=cmap(i % 10), 
                     linestyle='--', 
                     linewidth=2,
-                    marker='s',
-                    markersize=3)
+                    drawstyle='steps-post',
+                    rasterized=True)
     
     ax.grid(True, linestyle='--', alpha=0.7)
     ax.set_xlabel(xlabel, fontsize=12)
@@ -114,17 +149,94 @@ def save_comparative_cdf_plot(data_km, data_pk8s, labels, title, xlabel, filenam
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
     
-    plt.tight_layout()
+    ax.figure.tight_layout()
     plot_path = os.path.join(directory, filename)
-    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.figure.savefig(plot_path, dpi=PLOT_DPI, bbox_inches='tight')
     print(f"{title} saved to: {plot_path}")
 
 
+def open_cache():
+    """
+    Prepare the audit logs cache directory, private to the current user (mode 0700).
+    Returns (cache_dir, parser_version), or (None, None) if caching is disabled or the
+    directory cannot be used safely: cached entries are pickles, so nobody else may write there.
+    """
+    if CACHE_DIR is None:
+        return None, None
+    
+    try:
+        CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = CACHE_DIR.stat()
+        if st.st_uid != os.getuid():
+            print(f"Warning: cache directory {CACHE_DIR} is not owned by the current user, caching disabled")
+            return None, None
+        if st.st_mode & 0o077:
+            os.chmod(CACHE_DIR, 0o700)
+        
+        # Cached metrics are only valid for the parser that produced them
+        with open(inspect.getsourcefile(parse_audit_logs_file_all), 'rb') as f:
+            parser_version = f"{CACHE_FORMAT}-{hashlib.sha1(f.read()).hexdigest()}"
+    except OSError as e:
+        print(f"Warning: cannot use cache directory {CACHE_DIR}, caching disabled: {str(e)}")
+        return None, None
+    
+    return CACHE_DIR, parser_version
+
+
+def cached_parse(audit_file, controller_name, service_ids, cache_dir, parser_version):
+    """
+    Parse an audit logs file for all services, reusing a pickled result from cache_dir
+    when neither the file nor the parser have changed since it was cached.
+    """
+    st = os.stat(audit_file)
+    key = f"{parser_version}|{os.path.abspath(audit_file)}|{st.st_mtime_ns}|{st.st_size}|{controller_name}|{','.join(service_ids)}"
+    cache_path = cache_dir / (hashlib.sha1(key.encode()).hexdigest() + ".pkl")
+    
+    if cache_path.is_file():
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, OSError) as e:
+            # Unreadable cache entry: drop it and parse the file again
+            print(f"    Warning: discarding cache entry for {audit_file}: {str(e)}")
+            try:
+                cache_path.unlink(missing_ok=True)
+            except OSError:
+                pass  # Overwritten below once the file is parsed again
+    
+    metrics = parse_audit_logs_file_all(audit_file, controller_name, service_ids)
+    
+    try:
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(metrics, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"    Warning: could not cache {audit_file}: {str(e)}")
+    
+    return metrics
+
+
+def _parse_audit_logs_task(task):
+    """
+    Parse an audit logs file for all services in a worker process.
+    Returns an empty dict if the file cannot be parsed.
+    """
+    audit_file, controller_name, service_ids, cache_dir, parser_version = task
+    print(f"  Processing {audit_file}...")
+    try:
+        if cache_dir is None:
+            return parse_audit_logs_file_all(audit_file, controller_name, service_ids)
+        return cached_parse(audit_file, controller_name, service_ids, cache_dir, parser_version)
+    except Exception as e:
+        print(f"    Error: {str(e)}")
+        return {}
+
+
 def process_experiment_data(root_path, num_services, controller_name):
     """
     Process experiment data for a single controller.
-    Returns dictionaries with all metrics organized by service.
+    Returns dictionaries with all metrics organized by service, as arrays (int64 for request counts, float64 otherwise).
     """
     print(f"\n{'='*60}")
     print(f"Processing {controller_name} data from: {root_path}")
@@ -138,47 +250,59 @@ def process_experiment_data(root_path, num_services, controller_name):
         service_path = os.path.join(root_path, service_name)
         
         if os.path.isdir(service_path):
-            all_files = os.listdir(service_path)
-            status_files[service_name] = [f for f in all_files if f.endswith("status.txt") and os.path.isfile(os.path.join(service_path, f))]
-            rps_files[service_name] = [f for f in all_files if f.startswith("rps") and os.path.isfile(os.path.join(service_path, f))]
+            # DirEntry.is_file() uses the type cached by the directory read, no extra stat() per file
+            with os.scandir(service_path) as it:
+                all_files = [entry.name for entry in it if entry.is_file()]
+            # Sorted once here, in iteration order for all the loops below
+            status_files[service_name] = sorted(f for f in all_files if f.endswith("status.txt"))
+            rps_files[service_name] = sorted(f for f in all_files if f.startswith("rps"))
     
     # Collect audit logs files
-    all_audit_files = os.listdir(root_path)
-    audit_files = [os.path.join(root_path, f) for f in all_audit_files if f.startswith("loki-logs-iteration") and os.path.isfile(os.path.join(root_path, f))]
+    with os.scandir(root_path) as it:
+        audit_files = [entry.path for entry in it if entry.name.startswith("loki-logs-iteration") and entry.is_file()]
+    audit_files.sort()
     
     print(f"Found {len(audit_files)} audit logs files")
     
-    # Process audit logs
+    # Process audit logs (each file is parsed once for all services)
     print("\nProcessing audit logs files...")
+    service_ids = [f"video-analytics-standalone-python-{i+1}" for i in range(num_services)]
+    cache_dir, parser_version = open_cache()
+    tasks = [(audit_file, controller_name, service_ids, cache_dir, parser_version) for audit_file in audit_files]
+    with ProcessPoolExecutor() as executor:
+        parsed_audit_files = dict(zip(audit_files, executor.map(_parse_audit_logs_task, tasks)))
+
     all_starts_processing_delays = []
     all_pod_creation_delays = []
     all_pod_startup_delays = []
     
     for i in range(num_services):
-        service_id = f"video-analytics-standalone-python-{i+1}"
-        service_name = f"service-{i+1}"
-        starts_processing_delays = []
-        pod_creation_delays = []
-        pod_start_delays = []
+        service_id = service_ids[i]
+        raw_delays = []
         
-        for audit_file in sorted(audit_files):
-            print(f"  Processing {audit_file} for {service_id}...")
-            try:
-                metrics = parse_audit_logs_file(audit_file, controller_name, service_id)
-                if metrics:
-                    # Calculate delays (converting nanoseconds to milliseconds)
-                    if controller_name == "preempt-k8s":
-                        starts_processing_delays.append((metrics['starts_processing_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    elif controller_name == "kube-manager":
-                        starts_processing_delays.append((metrics['pod_created_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    pod_creation_delays.append((metrics['pod_created_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-                    pod_start_delays.append((metrics['pod_started_timestamp'] - metrics['scale_up_timestamp']) / 1_000_000)
-            except Exception as e:
-                print(f"    Error: {str(e)}")
+        for audit_file in audit_files:
+            metrics = parsed_audit_files[audit_file].get(service_id)
+            if isinstance(metrics, ValueError):
+                print(f"    Error in {audit_file} for {service_id}: {str(metrics)}")
+                continue
+            if metrics:
+                scale_up = metrics['scale_up_timestamp']
+                # kube-manager starts processing when it creates the pod
+                if controller_name == "preempt-k8s":
+                    starts_processing = metrics['starts_processing_timestamp']
+                else:
+                    starts_processing = metrics['pod_created_timestamp']
+                raw_delays.append((
+                    starts_processing - scale_up,
+                    metrics['pod_created_timestamp'] - scale_up,
+                    metrics['pod_started_timestamp'] - scale_up
+                ))
         
-        all_starts_processing_delays.append(starts_processing_delays)
-        all_pod_creation_delays.append(pod_creation_delays)
-        all_pod_startup_delays.append(pod_start_delays)
+        # Convert all delays from nanoseconds to milliseconds at once
+        delays = np.asarray(raw_delays, dtype=np.float64).reshape(-1, 3) / 1_000_000
+        all_starts_processing_delays.append(delays[:, 0])
+        all_pod_creation_delays.append(delays[:, 1])
+        all_pod_startup_delays.append(delays[:, 2])
     
     # Process status and rps files
     print("\nProcessing status and rps files...")
@@ -196,7 +320,7 @@ def process_experiment_data(root_path, num_services, controller_name):
         completed_requests = []
         real_rps = []
         
-        for status_file in sorted(status_files[service_name]):
+        for status_file in status_files[service_name]:
             file_path = os.path.join(root_path, service_name, status_file)
             try:
                 status_data = parse_status_file(file_path)
@@ -215,21 +339,19 @@ def process_experiment_data(root_path, num_services, controller_name):
         mean_latencies = []
         max_latencies = []
         
-        for rps_file in sorted(rps_files[service_name]):
+        for rps_file in rps_files[service_name]:
             file_path = os.path.join(root_path, service_name, rps_file)
             try:
-                latencies = parse_rps_file(file_path)
-                mean_lat = sum(latencies) / len(latencies)
-                max_lat = max(latencies)
-                mean_latencies.append(mean_lat / 1000)  # Convert to milliseconds from microseconds
-                max_latencies.append(max_lat / 1000)  # Convert to milliseconds from microseconds
+                mean_lat, max_lat = _rps_stats(file_path)
+                mean_latencies.append(mean_lat)
+                max_latencies.append(max_lat)
             except Exception as e:
                 print(f"    Error parsing {rps_file}: {str(e)}")
         
         all_mean_latencies.append(mean_latencies)
         all_max_latencies.append(max_latencies)
     
-    return {
+    metrics = {
         'starts_processing_delays': all_starts_processing_delays,
         'pod_creation_delays': all_pod_creation_delays,
         'pod_startup_delays': all_pod_startup_delays,
@@ -239,17 +361,96 @@ def process_experiment_data(root_path, num_services, controller_name):
         'mean_latencies': all_mean_latencies,
         'max_latencies': all_max_latencies
     }
+    
+    # Convert once to contiguous arrays, shared by the CSV stats and the plots
+    return {metric_key: [np.ascontiguousarray(values, dtype=METRIC_DTYPES.get(metric_key, np.float64)) for values in per_service]
+            for metric_key, per_service in metrics.items()}
+
+
+def save_comparative_plots(data_km, data_pk8s, labels, directory):
+    """
+    Create all comparative box plots and CDF plots.
+    """
+    # matplotlib is only imported when plots are requested
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    # Each metric gets a box plot (title, ylabel, file) and optionally a CDF plot (title, xlabel, file)
+    plots_config = [
+        ('starts_processing_delays',
+         ("Comparative Starts Processing Delays", "Delays [ms]", "comparative_boxplot_starts_processing_delays.png"),
+         ("Comparative CDF of Starts Processing Delays", "Starts Processing Delays [ms]", "comparative_cdf_starts_processing_delays.png")),
+        ('pod_creation_delays',
+         ("Comparative Pod Creation Delays", "Delays [ms]", "comparative_boxplot_pod_creation_delays.png"),
+         ("Comparative CDF of Pod Creation Delays", "Pod Creation Delays [ms]", "comparative_cdf_pod_creation_delays.png")),
+        ('pod_startup_delays',
+         ("Comparative Pod Startup Delays", "Delays [ms]", "comparative_boxplot_pod_startup_delays.png"),
+         ("Comparative CDF of Pod Startup Delays", "Pod Startup Delays [ms]", "comparative_cdf_pod_startup_delays.png")),
+        ('lost_requests',
+         ("Comparative Lost Requests", "Number of Requests", "comparative_boxplot_lost_requests.png"),
+         None),
+        ('completed_requests',
+         ("Comparative Completed Requests", "Number of Requests", "comparative_boxplot_completed_requests.png"),
+         None),
+        ('real_rps',
+         ("Comparative Real RPS", "Real RPS", "comparative_boxplot_real_rps.png"),
+         None),
+        ('mean_latencies',
+         ("Comparative Mean Latencies", "Latencies [ms]", "comparative_boxplot_mean_latencies.png"),
+         ("Comparative CDF of Mean Latencies", "Mean Latencies [ms]", "comparative_cdf_mean_latencies.png")),
+        ('max_latencies',
+         ("Comparative Max Latencies", "Latencies [ms]", "comparative_boxplot_max_latencies.png"),
+         ("Comparative CDF of Max Latencies", "Max Latencies [ms]", "comparative_cdf_max_latencies.png"))
+    ]
+    
+    # One figure is reused for all box plots and one for all CDF plots
+    box_fig, box_ax = plt.subplots(figsize=(14, 6))
+    cdf_fig, cdf_ax = plt.subplots(figsize=(10, 6))
+    for metric_key, box_config, cdf_config in plots_config:
+        # Sort every series once, both plots are built from the sorted arrays
+        sorted_km = [np.sort(values) for values in data_km[metric_key]]
+        sorted_pk8s = [np.sort(values) for values in data_pk8s[metric_key]]
+        
+        title, ylabel, fname = box_config
+        save_comparative_boxplot(
+            box_ax,
+            sorted_km, 
+            sorted_pk8s, 
+            labels, 
+            title, 
+            ylabel, 
+            fname, 
+            directory
+        )
+        
+        if cdf_config is not None:
+            title, xlabel, fname = cdf_config
+            save_comparative_cdf_plot(
+                cdf_ax,
+                sorted_km, 
+                sorted_pk8s, 
+                labels, 
+                title, 
+                xlabel, 
+                fname, 
+                directory
+            )
+    plt.close(box_fig)
+    plt.close(cdf_fig)
 
 
 def main():
     # Validate command line arguments
-    if len(sys.argv) != 4:
-        print("Usage: python compare-results.py <path_to_kube_manager_results> <path_to_preempt_k8s_results> <number_of_services>")
+    args = [arg for arg in sys.argv[1:] if arg != "--no-plots"]
+    no_plots = len(args) != len(sys.argv) - 1
+    if len(args) != 3:
+        print("Usage: python compare-results.py <path_to_kube_manager_results> <path_to_preempt_k8s_results> <number_of_services> [--no-plots]")
         sys.exit(1)
     
-    km_path = sys.argv[1]
-    pk8s_path = sys.argv[2]
-    num_services = int(sys.argv[3])
+    km_path = args[0]
+    pk8s_path = args[1]
+    num_services = int(args[2])
     
     # Validate paths
     if not os.path.isdir(km_path):
@@ -307,101 +508,37 @@ def main():
             'Pod Startup Delay Mean [ms]', 'Pod Startup Delay Max [ms]'
         ])
         
+        # Metric columns as (metric, index in the (mean, max) tuple), in header order
+        columns = [
+            ('mean_latencies', 0), ('max_latencies', 0),
+            ('lost_requests', 0), ('lost_requests', 1),
+            ('completed_requests', 0), ('completed_requests', 1),
+            ('real_rps', 0), ('real_rps', 1),
+            ('starts_processing_delays', 0), ('starts_processing_delays', 1),
+            ('pod_creation_delays', 0), ('pod_creation_delays', 1),
+            ('pod_startup_delays', 0), ('pod_startup_delays', 1)
+        ]
+        
+        rows = []
         for i in range(num_services):
             service_name = f"service-{i+1}"
-            
-            # kube-manager row
-            if km_data['mean_latencies'][i]:
-                writer.writerow([
-                    service_name, 'kube-manager',
-                    sum(km_data['mean_latencies'][i]) / len(km_data['mean_latencies'][i]),
-                    sum(km_data['max_latencies'][i]) / len(km_data['max_latencies'][i]),
-                    sum(km_data['lost_requests'][i]) / len(km_data['lost_requests'][i]),
-                    max(km_data['lost_requests'][i]) if km_data['lost_requests'][i] else 0,
-                    sum(km_data['completed_requests'][i]) / len(km_data['completed_requests'][i]),
-                    max(km_data['completed_requests'][i]) if km_data['completed_requests'][i] else 0,
-                    sum(km_data['real_rps'][i]) / len(km_data['real_rps'][i]),
-                    max(km_data['real_rps'][i]) if km_data['real_rps'][i] else 0,
-                    sum(km_data['starts_processing_delays'][i]) / len(km_data['starts_processing_delays'][i]) if km_data['starts_processing_delays'][i] else 0,
-                    max(km_data['starts_processing_delays'][i]) if km_data['starts_processing_delays'][i] else 0,
-                    sum(km_data['pod_creation_delays'][i]) / len(km_data['pod_creation_delays'][i]) if km_data['pod_creation_delays'][i] else 0,
-                    max(km_data['pod_creation_delays'][i]) if km_data['pod_creation_delays'][i] else 0,
-                    sum(km_data['pod_startup_delays'][i]) / len(km_data['pod_startup_delays'][i]) if km_data['pod_startup_delays'][i] else 0,
-                    max(km_data['pod_startup_delays'][i]) if km_data['pod_startup_delays'][i] else 0
-                ])
-            
-            # preempt-k8s row
-            if pk8s_data['mean_latencies'][i]:
-                writer.writerow([
-                    service_name, 'preempt-k8s',
-                    sum(pk8s_data['mean_latencies'][i]) / len(pk8s_data['mean_latencies'][i]),
-                    sum(pk8s_data['max_latencies'][i]) / len(pk8s_data['max_latencies'][i]),
-                    sum(pk8s_data['lost_requests'][i]) / len(pk8s_data['lost_requests'][i]),
-                    max(pk8s_data['lost_requests'][i]) if pk8s_data['lost_requests'][i] else 0,
-                    sum(pk8s_data['completed_requests'][i]) / len(pk8s_data['completed_requests'][i]),
-                    max(pk8s_data['completed_requests'][i]) if pk8s_data['completed_requests'][i] else 0,
-                    sum(pk8s_data['real_rps'][i]) / len(pk8s_data['real_rps'][i]),
-                    max(pk8s_data['real_rps'][i]) if pk8s_data['real_rps'][i] else 0,
-                    sum(pk8s_data['starts_processing_delays'][i]) / len(pk8s_data['starts_processing_delays'][i]) if pk8s_data['starts_processing_delays'][i] else 0,
-                    max(pk8s_data['starts_processing_delays'][i]) if pk8s_data['starts_processing_delays'][i] else 0,
-                    sum(pk8s_data['pod_creation_delays'][i]) / len(pk8s_data['pod_creation_delays'][i]) if pk8s_data['pod_creation_delays'][i] else 0,
-                    max(pk8s_data['pod_creation_delays'][i]) if pk8s_data['pod_creation_delays'][i] else 0,
-                    sum(pk8s_data['pod_startup_delays'][i]) / len(pk8s_data['pod_startup_delays'][i]) if pk8s_data['pod_startup_delays'][i] else 0,
-                    max(pk8s_data['pod_startup_delays'][i]) if pk8s_data['pod_startup_delays'][i] else 0
-                ])
+            for controller_name, data in (('kube-manager', km_data), ('preempt-k8s', pk8s_data)):
+                if not data['mean_latencies'][i].size:
+                    continue
+                stats = {metric_key: _mm(data[metric_key][i]) for metric_key in data}
+                rows.append([service_name, controller_name] + [stats[metric_key][j] for metric_key, j in columns])
+        writer.writerows(rows)
     
     print(f"CSV saved to: {csv_path}")
     
-    # Create comparative box plots
-    print("\n" + "="*60)
-    print("Creating comparative box plots...")
-    print("="*60)
-    
-    box_plots_config = [
-        ('starts_processing_delays', "Comparative Starts Processing Delays", "Delays [ms]", "comparative_boxplot_starts_processing_delays.png"),
-        ('pod_creation_delays', "Comparative Pod Creation Delays", "Delays [ms]", "comparative_boxplot_pod_creation_delays.png"),
-        ('pod_startup_delays', "Comparative Pod Startup Delays", "Delays [ms]", "comparative_boxplot_pod_startup_delays.png"),
-        ('lost_requests', "Comparative Lost Requests", "Number of Requests", "comparative_boxplot_lost_requests.png"),
-        ('completed_requests', "Comparative Completed Requests", "Number of Requests", "comparative_boxplot_completed_requests.png"),
-        ('real_rps', "Comparative Real RPS", "Real RPS", "comparative_boxplot_real_rps.png"),
-        ('mean_latencies', "Comparative Mean Latencies", "Latencies [ms]", "comparative_boxplot_mean_latencies.png"),
-        ('max_latencies', "Comparative Max Latencies", "Latencies [ms]", "comparative_boxplot_max_latencies.png")
-    ]
-    
-    for metric_key, title, ylabel, fname in box_plots_config:
-        save_comparative_boxplot(
-            km_data[metric_key], 
-            pk8s_data[metric_key], 
-            service_labels, 
-            title, 
-            ylabel, 
-            fname, 
-            str(output_dir)
-        )
-    
-    # Create comparative CDF plots
-    print("\n" + "="*60)
-    print("Creating comparative CDF plots...")
-    print("="*60)
-    
-    cdf_plots_config = [
-        ('starts_processing_delays', "Comparative CDF of Starts Processing Delays", "Starts Processing Delays [ms]", "comparative_cdf_starts_processing_delays.png"),
-        ('pod_creation_delays', "Comparative CDF of Pod Creation Delays", "Pod Creation Delays [ms]", "comparative_cdf_pod_creation_delays.png"),
-        ('pod_startup_delays', "Comparative CDF of Pod Startup Delays", "Pod Startup Delays [ms]", "comparative_cdf_pod_startup_delays.png"),
-        ('mean_latencies', "Comparative CDF of Mean Latencies", "Mean Latencies [ms]", "comparative_cdf_mean_latencies.png"),
-        ('max_latencies', "Comparative CDF of Max Latencies", "Max Latencies [ms]", "comparative_cdf_max_latencies.png")
-    ]
-    
-    for metric_key, title, xlabel, fname in cdf_plots_config:
-        save_comparative_cdf_plot(
-            km_data[metric_key], 
-            pk8s_data[metric_key], 
-            service_labels, 
-            title, 
-            xlabel, 
-            fname, 
-            str(output_dir)
-        )
+    # Create comparative box plots and CDF plots
+    if no_plots:
+        print("\nSkipping plots (--no-plots)")
+    else:
+        print("\n" + "="*60)
+        print("Creating comparative box plots and CDF plots...")
+        print("="*60)
+        save_comparative_plots(km_data, pk8s_data, service_labels, str(output_dir))
     
     print("\n" + "="*60)
     print("Comparison completed successfully!")